@@ -15,27 +15,35 @@ Key Features:
 - Comprehensive error logging and recovery mechanisms
 """
 
-import os
+import hashlib
+import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+from .config import CHART_THRESHOLDS, SEMANTIC_CACHE_CONFIG
 from .core import (
+    cache_generated_sql,
     fix_sql_syntax,
     generate_sql_with_ai,
     heuristic_sql_fallback,
     learn_from_error,
 )
 from .data import (
+    EMBEDDINGS_ARE_SEMANTIC,
+    SemanticCache,
+    create_embedding,
     create_result_dictionary,
     find_similar_questions,
     generate_chart_from_rows,
     generate_simple_chart_from_rows,
     get_cache,
     get_schema_metadata,
+    normalize_question,
     respond,
     run_sql,
     set_cache,
     store_question_embedding,
-    to_jsonable,
 )
 from .enums import ErrorType, QueryCategory, SQLSource
 from .learning import (
@@ -51,10 +59,63 @@ from .learning import (
 )
 from .utils import log_ai_error, validate_question_input
 
+# Failures are logged at WARNING and recovery steps at INFO; arguments are
+# only formatted when a handler accepts the record
+logger = logging.getLogger(__name__)
+
+# Maps question embeddings to the result-cache key of the question they
+# were first asked as; the answers themselves stay in the TTL result cache
+_answer_cache = SemanticCache(**SEMANTIC_CACHE_CONFIG["answer"])
+
+# Categorizer output mapped to the enum without raising for unknown values
+_CATEGORIES_BY_VALUE = {category.value: category for category in QueryCategory}
+
+# Sources that count as an AI attempt, and sources whose SQL is stored for
+# similar-question lookup
+_AI_ATTEMPT_SOURCES = frozenset({SQLSource.AI, SQLSource.HEURISTIC_FALLBACK})
+_STORED_SOURCES = frozenset({SQLSource.AI, SQLSource.HEURISTIC})
+
+# Renders charts while the request thread waits on the vector store
+_chart_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chart")
+
+# Writes question embeddings after the response is built; one worker keeps
+# vector-store writes in order
+_store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store")
+
+
+def _respond_and_cache(
+    cache_key: Optional[str], result: dict, question_embedding: Optional[list]
+) -> dict:
+    """Encode a finished result once, caching the payload that is returned.
+
+    Nothing is cached when cache_key is None.
+    """
+    # Cache hits then return exactly what the first response did, with dates
+    # and decimals already encoded
+    payload = respond(result)
+    if cache_key is not None:
+        set_cache(cache_key, payload)
+        if EMBEDDINGS_ARE_SEMANTIC and question_embedding is not None:
+            _answer_cache.set(cache_key, question_embedding, cache_key)
+    return payload
+
+
+def _store_question_in_background(
+    question: str, sql: str, metadata: dict, embedding: list
+) -> None:
+    """Store a successful question's embedding; failures never reach the caller."""
+    try:
+        store_question_embedding(
+            question=question, sql=sql, metadata=metadata, embedding=embedding
+        )
+    except Exception as e:
+        logger.warning("Failed to store question embedding: %s", e)
+
 
 def answer_question(question: str, force_heuristic: bool = False) -> dict:
     """Answer a natural language question using AI-powered SQL generation."""
-    start_time = time.time()
+    # Monotonic clock for response times; wall-clock steps would skew metrics
+    start_time = time.perf_counter()
 
     # Validate input using error handler
     validation_error = validate_question_input(question, start_time)
@@ -65,32 +126,64 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
     category_str, confidence, category_metadata = categorize_query(question)
 
     # Convert string category to enum
-    try:
-        category = QueryCategory(category_str)
-    except ValueError:
-        category = QueryCategory.UNKNOWN
+    category = _CATEGORIES_BY_VALUE.get(category_str, QueryCategory.UNKNOWN)
+
+    # Forced heuristic runs (benchmarks, fallback checks) skip the answer
+    # cache and the vector store so they always exercise the heuristic path
+    cache_key = question_embedding = cached = None
+    cache_match = "exact"
+    if not force_heuristic:
+        # Same normalization as the SQL and schema-context caches, hashed so
+        # the key stays short however long the question is
+        digest = hashlib.blake2b(normalize_question(question).encode(), digest_size=16)
+        cache_key = f"q::{digest.hexdigest()}"
+        cached = get_cache(cache_key)
+        if not cached:
+            # Embed once for the semantic lookup, storage and suggestions below;
+            # without an embedding those steps are skipped, not the answer
+            try:
+                question_embedding = create_embedding(question)
+            except Exception as e:
+                logger.warning("Failed to embed question: %s", e)
+            # Near-identical rephrasings reuse the answer cached for the original.
+            # Hash embeddings never score a rephrasing that high, so the lookup
+            # only runs once embeddings are semantic.
+            similar_key = None
+            if EMBEDDINGS_ARE_SEMANTIC and question_embedding is not None:
+                similar_key = _answer_cache.get_similar(question_embedding)
+            if similar_key is not None:
+                cached = get_cache(similar_key)
+                if cached:
+                    cache_match = "similar"
+                    # Repeats of this phrasing then hit without being embedded
+                    set_cache(cache_key, cached)
 
-    q = question.lower()
-    cache_key = f"q::{q.strip()}"
-    cached = get_cache(cache_key)
     if cached:
-        # Add source info for cached results
-        cached["sql_source"] = SQLSource.CACHE.value
-        cached["sql_corrected"] = False
-        cached["query_category"] = category.value
-        cached["category_confidence"] = confidence
+        # Add source info to a copy; the cached payload is shared by every
+        # hit, and by two keys after a similar match
+        response_time = time.perf_counter() - start_time
+        cached = {
+            **cached,
+            "sql_source": SQLSource.CACHE.value,
+            "cache_match": cache_match,
+            "sql_corrected": False,
+            "query_category": category.value,
+            "category_confidence": confidence,
+            "response_time": response_time,
+        }
 
         # Record cache hit metrics
-        response_time = time.time() - start_time
-        cached["response_time"] = response_time
         record_cache_hit_metrics(question, cached, response_time)
 
         return cached
 
-    try:
-        # Get schema information for AI context
-        schema_info = get_schema_metadata()
+    # One timestamp per request for embedding metadata and error details
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    # Set when SQL execution fails so the outer handler can report it
+    sql_error_details = None
 
+    try:
         # Generate SQL using AI (with fallback to heuristic) or force heuristic
         if force_heuristic:
             # Force heuristic generation
@@ -99,6 +192,9 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
             sql_source = SQLSource.HEURISTIC
             ai_fallback_error = False
         else:
+            # Get schema information for AI context
+            schema_info = get_schema_metadata()
+
             # Generate SQL using AI (with fallback to heuristic)
             sql, sql_corrected, sql_source = generate_sql_with_ai(question, schema_info)
 
@@ -106,7 +202,7 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
             ai_fallback_error = sql_source == SQLSource.HEURISTIC_FALLBACK
 
         # Record AI attempt (even if it failed and fell back to heuristic)
-        if sql_source in [SQLSource.AI, SQLSource.HEURISTIC_FALLBACK]:
+        if sql_source in _AI_ATTEMPT_SOURCES:
             record_ai_attempt_metrics(
                 question, sql, ai_fallback_error, category, confidence
             )
@@ -115,44 +211,66 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
         try:
             rows = run_sql(sql)
         except Exception as sql_error:
+            # Driver errors can embed the whole statement; stringify once
+            sql_error_message = str(sql_error)
             sql_error_details = {
                 "type": ErrorType.SQL_EXECUTION_ERROR.value,
                 "exception_type": type(sql_error).__name__,
-                "exception_message": str(sql_error),
+                "exception_message": sql_error_message,
                 "sql_attempted": sql,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp,
             }
-            print(f"SQL execution failed: {sql_error}")
-            print(f"SQL error details: {sql_error_details}")
+            logger.warning("SQL execution failed: %s", sql_error_message)
+            logger.warning("SQL error details: %s", sql_error_details)
 
             # Learn from this error
-            learn_from_error(sql, str(sql_error))
+            learn_from_error(sql, sql_error_message)
 
             # Try to fix SQL errors and retry
-            print("Attempting to fix SQL syntax...")
+            logger.info("Attempting to fix SQL syntax...")
             fixed_sql, fixes_applied = fix_sql_syntax(sql)
 
             if fixes_applied:
-                print(f"Fixed SQL: {fixed_sql}")
+                logger.info("Fixed SQL: %s", fixed_sql)
                 try:
                     rows = run_sql(fixed_sql)
                     sql = fixed_sql  # Use the fixed SQL in response
                     sql_corrected = True
-                    print("SQL fix successful!")
+                    logger.info("SQL fix successful!")
                 except Exception as retry_error:
                     # Even the fixed SQL failed
                     sql_error_details["retry_failed"] = {
                         "fixed_sql": fixed_sql,
                         "retry_error": str(retry_error),
                     }
-                    print(f"SQL fix failed: {retry_error}")
+                    logger.warning("SQL fix failed: %s", retry_error)
                     raise sql_error
             else:
-                print("No SQL fixes could be applied")
+                logger.info("No SQL fixes could be applied")
                 raise sql_error
 
-        # Generate chart if we have numeric data
-        chart_json = generate_chart_from_rows(rows, question)
+        # Only SQL that actually ran is worth handing out again
+        if sql_source == SQLSource.AI:
+            cache_generated_sql(question, schema_info, sql, sql_corrected)
+
+        # Generate chart if we have numeric data, in the background while the
+        # vector store is searched for related questions. Empty and
+        # single-column results (lone aggregates) can never be charted, so
+        # they skip the hand-off to the chart thread.
+        chart_future = None
+        if rows and len(rows[0]) >= CHART_THRESHOLDS["min_columns"]:
+            chart_future = _chart_executor.submit(
+                generate_chart_from_rows, rows, question
+            )
+        similar_queries = []
+        if question_embedding is not None:
+            try:
+                similar_queries = find_similar_questions(
+                    question, n_results=3, embedding=question_embedding
+                )
+            except Exception as e:
+                logger.warning("Failed to get related questions: %s", e)
+        chart_json = chart_future.result() if chart_future is not None else None
 
         # Create result dictionary using result processor
         result = create_result_dictionary(
@@ -160,91 +278,87 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
             sql=sql,
             rows=rows,
             chart_json=chart_json,
+            # None means no chart fits these rows; don't render them again
+            generate_chart=False,
             sql_source=sql_source,
             sql_corrected=sql_corrected,
             ai_fallback_error=ai_fallback_error,
             category=category,
             confidence=confidence,
-            response_time=time.time() - start_time,
+            response_time=time.perf_counter() - start_time,
         )
 
         # Store successful query in question embeddings for future learning
-        if sql_source in [SQLSource.AI, SQLSource.HEURISTIC] and not sql_corrected:
-            try:
-
-                store_question_embedding(
-                    question=question,
-                    sql=sql,
-                    metadata={
-                        "sql_source": sql_source,
-                        "rows_count": len(rows),
-                        "has_chart": chart_json is not None,
-                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                )
-            except Exception as e:
-                if os.getenv("DEBUG") == "true":
-                    print(f"Failed to store question embedding: {e}")
-
-        # Get query suggestions and related questions
-        try:
-            similar_queries = find_similar_questions(question, n_results=3)
-            result["query_suggestions"] = get_query_suggestions(
-                question, category.value, n_suggestions=3
-            )
-            result["related_questions"] = get_related_questions(
-                question, similar_queries
+        if (
+            sql_source in _STORED_SOURCES
+            and not sql_corrected
+            and question_embedding is not None
+        ):
+            # Nothing in the response depends on the write, so don't wait on it
+            _store_executor.submit(
+                _store_question_in_background,
+                question,
+                sql,
+                {
+                    "sql_source": sql_source,
+                    "rows_count": len(rows),
+                    "has_chart": chart_json is not None,
+                    "timestamp": timestamp,
+                },
+                question_embedding,
             )
-        except Exception as e:
-            if os.getenv("DEBUG") == "true":
-                print(f"Failed to get query suggestions: {e}")
-            result["query_suggestions"] = []
-            result["related_questions"] = []
+
+        # Suggestions come from static per-category patterns; related questions
+        # from the vector search made above
+        result["query_suggestions"] = get_query_suggestions(
+            question, category.value, n_suggestions=3
+        )
+        result["related_questions"] = get_related_questions(question, similar_queries)
 
         # Record metrics for learning (only if this wasn't already recorded as AI attempt)
         record_successful_query_metrics(
             question, result, result["response_time"], sql_source
         )
 
-        set_cache(cache_key, to_jsonable(result))
-        return respond(result)
+        return _respond_and_cache(cache_key, result, question_embedding)
 
     except Exception as e:
+        error_message = str(e)
         # Check if we have SQL error details from the inner try block
-        if "sql_error_details" in locals():
-            error_details = sql_error_details
-            error_details["question"] = question
+        if sql_error_details is not None:
+            # Copy rather than mutate the inner block's dict
+            error_details = {**sql_error_details, "question": question}
         else:
             error_details = {
                 "type": ErrorType.AI_GENERATION_EXCEPTION.value,
                 "exception_type": type(e).__name__,
-                "exception_message": str(e),
+                "exception_message": error_message,
                 "question": question,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp,
             }
-        print(f"Error in answer_question: {e}")
-        print(f"Error details: {error_details}")
+        logger.warning("Error in answer_question: %s", error_message)
+        logger.warning("Error details: %s", error_details)
 
         # Log AI error with full context
         log_ai_error(
             question=question,
             sql=error_details.get("generated_sql", ""),
-            error_message=str(e),
+            error_message=error_message,
             error_type=ErrorType.AI_GENERATION_EXCEPTION.value,
             additional_context={
                 "error_details": error_details,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp,
             },
         )
 
         # Record error metrics
         record_error_metrics_with_context(
-            ErrorType.AI_GENERATION_EXCEPTION.value, str(e)
+            ErrorType.AI_GENERATION_EXCEPTION.value, error_message
         )
 
         # Try heuristic fallback
         try:
-            print("Attempting heuristic fallback...")
+            logger.info("Attempting heuristic fallback...")
             sql = heuristic_sql_fallback(question)
             sql_source = SQLSource.HEURISTIC
             sql_corrected = False
@@ -265,18 +379,17 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
                 ai_fallback_error=True,  # This is a fallback due to AI failure
                 category=category,
                 confidence=confidence,
-                response_time=time.time() - start_time,
+                response_time=time.perf_counter() - start_time,
                 error_details=error_details,  # Include the original error details
             )
 
             # Record the successful heuristic fallback
             record_heuristic_fallback_metrics(question, result)
 
-            set_cache(cache_key, to_jsonable(result))
-            return respond(result)
+            return _respond_and_cache(cache_key, result, question_embedding)
 
         except Exception as heuristic_error:
-            print(f"Heuristic fallback also failed: {heuristic_error}")
+            logger.warning("Heuristic fallback also failed: %s", heuristic_error)
             # Create error result dictionary using result processor
             error_result = create_result_dictionary(
                 question=question,
@@ -288,13 +401,15 @@ def answer_question(question: str, force_heuristic: bool = False) -> dict:
                 ai_fallback_error=False,
                 category=category,
                 confidence=confidence,
-                response_time=time.time() - start_time,
+                response_time=time.perf_counter() - start_time,
                 error_details={
                     "type": ErrorType.COMPLETE_FAILURE.value,
                     "original_exception": error_details,
                     "heuristic_fallback_exception": {
                         "exception_type": type(heuristic_error).__name__,
                         "exception_message": str(heuristic_error),
+                        # The fallback runs after the AI attempt failed, often
+                        # seconds after the request started
                         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                     },
                 },
@@ -5,6 +5,7 @@ Contains configuration data structures for query categorization,
 suggestion patterns, metrics tracking, chart type determination, SQL correction, and heuristic patterns.
 """
 
+from .cache_config import SEMANTIC_CACHE_CONFIG
 from .chart_type_rules import (
     CATEGORICAL_KEYWORDS,
     CHART_THRESHOLDS,
@@ -14,7 +15,7 @@ from .chart_type_rules import (
     TIME_KEYWORDS,
     TIME_PATTERNS,
 )
-from .heuristic_patterns import FALLBACK_QUERIES, HEURISTIC_PATTERNS
+from .heuristic_patterns import FALLBACK_QUERIES, HEURISTIC_PATTERNS, HeuristicPattern
 from .metrics_config import DEFAULT_METRICS_CONFIG
 from .query_categories import QUERY_CATEGORIES
 from .sql_correction_patterns import (
@@ -23,6 +24,7 @@ from .sql_correction_patterns import (
     LEARNED_PATTERNS,
     SQL_PATTERNS,
     SQL_THRESHOLDS,
+    LearnedPattern,
 )
 from .suggestion_patterns import GENERAL_SUGGESTIONS, SUGGESTION_PATTERNS
 from .test_questions import TEST_CONFIG, TEST_QUESTIONS
@@ -32,6 +34,7 @@ __all__ = [
     "FALLBACK_QUERIES",
     "GENERAL_SUGGESTIONS",
     "HEURISTIC_PATTERNS",
+    "HeuristicPattern",
     "QUERY_CATEGORIES",
     "SUGGESTION_PATTERNS",
     "TEST_CONFIG",
@@ -46,6 +49,8 @@ __all__ = [
     "COMMON_AMBIGUOUS_COLUMNS",
     "AGGREGATE_FUNCTIONS",
     "LEARNED_PATTERNS",
+    "LearnedPattern",
     "SQL_PATTERNS",
     "SQL_THRESHOLDS",
+    "SEMANTIC_CACHE_CONFIG",
 ]
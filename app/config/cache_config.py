@@ -0,0 +1,30 @@
+"""
+Cache Configuration
+
+Centralized settings for the in-process caches used to skip repeated
+retrieval and generation work.
+"""
+
+import os
+from typing import Any, Dict
+
+# Semantic caches: similarity threshold is cosine similarity between
+# question embeddings; entries beyond max_entries are evicted LRU-first.
+# The similarity tiers of both caches are disabled until real embeddings are
+# configured (schema_index.EMBEDDINGS_ARE_SEMANTIC, False with the default
+# hash embeddings); until then only exact question matches hit, and
+# similarity_threshold has no effect.
+SEMANTIC_CACHE_CONFIG: Dict[str, Dict[str, Any]] = {
+    "schema_context": {
+        "similarity_threshold": 0.93,
+        "max_entries": 512,
+        "ttl_seconds": 15 * 60,
+    },
+    # Whole answers are reused for rephrasings, so a false match returns the
+    # wrong result; keep the threshold strict even once embeddings are semantic
+    "answer": {
+        "similarity_threshold": float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.99")),
+        "max_entries": 1000,
+        "ttl_seconds": 15 * 60,
+    },
+}
@@ -64,6 +64,7 @@ CATEGORICAL_KEYWORDS = ["category", "type", "segment", "group"]
 
 # Chart type selection thresholds
 CHART_THRESHOLDS = {
+    "min_columns": 2,  # an x and a y column
     "pie_max_categories": 8,
     "pie_min_categories": 2,
     "quarter_max_points": 4,
@@ -5,52 +5,41 @@ Centralized configuration for keyword-to-generator mappings
 used in heuristic SQL fallback generation.
 """
 
+from typing import List, NamedTuple
+
+
+class HeuristicPattern(NamedTuple):
+    """Keywords that select a heuristic SQL generator."""
+
+    keywords: List[str]
+    generator: str
+
+
 HEURISTIC_PATTERNS = [
     # Revenue/Sales patterns
-    {
-        "keywords": ["top", "product", "revenue"],
-        "generator": "_generate_revenue_query",
-    },
-    {"keywords": ["top", "product", "sales"], "generator": "_generate_revenue_query"},
-    {
-        "keywords": ["best", "selling", "product"],
-        "generator": "_generate_revenue_query",
-    },
-    {
-        "keywords": ["highest", "revenue", "product"],
-        "generator": "_generate_revenue_query",
-    },
+    HeuristicPattern(["top", "product", "revenue"], "_generate_revenue_query"),
+    HeuristicPattern(["top", "product", "sales"], "_generate_revenue_query"),
+    HeuristicPattern(["best", "selling", "product"], "_generate_revenue_query"),
+    HeuristicPattern(["highest", "revenue", "product"], "_generate_revenue_query"),
     # Time-based patterns
-    {"keywords": ["sales", "month"], "generator": "_generate_monthly_sales_query"},
-    {"keywords": ["monthly", "sales"], "generator": "_generate_monthly_sales_query"},
-    {"keywords": ["monthly", "revenue"], "generator": "_generate_monthly_sales_query"},
-    {"keywords": ["revenue", "trend"], "generator": "_generate_monthly_sales_query"},
-    {
-        "keywords": ["quarterly", "quarter"],
-        "generator": "_generate_quarterly_sales_query",
-    },
-    {
-        "keywords": ["sales", "quarter"],
-        "generator": "_generate_quarterly_sales_query",
-    },
-    {
-        "keywords": ["revenue", "quarter"],
-        "generator": "_generate_quarterly_sales_query",
-    },
+    HeuristicPattern(["sales", "month"], "_generate_monthly_sales_query"),
+    HeuristicPattern(["monthly", "sales"], "_generate_monthly_sales_query"),
+    HeuristicPattern(["monthly", "revenue"], "_generate_monthly_sales_query"),
+    HeuristicPattern(["revenue", "trend"], "_generate_monthly_sales_query"),
+    HeuristicPattern(["quarterly", "quarter"], "_generate_quarterly_sales_query"),
+    HeuristicPattern(["sales", "quarter"], "_generate_quarterly_sales_query"),
+    HeuristicPattern(["revenue", "quarter"], "_generate_quarterly_sales_query"),
     # Customer patterns
-    {"keywords": ["top", "customer"], "generator": "_generate_customer_query"},
-    {
-        "keywords": ["customer", "order", "value"],
-        "generator": "_generate_customer_query",
-    },
-    {"keywords": ["new", "customer"], "generator": "_generate_new_customer_query"},
+    HeuristicPattern(["top", "customer"], "_generate_customer_query"),
+    HeuristicPattern(["customer", "order", "value"], "_generate_customer_query"),
+    HeuristicPattern(["new", "customer"], "_generate_new_customer_query"),
     # Product patterns
-    {"keywords": ["product", "inventory"], "generator": "_generate_inventory_query"},
-    {"keywords": ["low", "stock"], "generator": "_generate_inventory_query"},
-    {"keywords": ["product", "category"], "generator": "_generate_category_query"},
+    HeuristicPattern(["product", "inventory"], "_generate_inventory_query"),
+    HeuristicPattern(["low", "stock"], "_generate_inventory_query"),
+    HeuristicPattern(["product", "category"], "_generate_category_query"),
     # Order patterns
-    {"keywords": ["order", "status"], "generator": "_generate_order_status_query"},
-    {"keywords": ["recent", "order"], "generator": "_generate_recent_orders_query"},
+    HeuristicPattern(["order", "status"], "_generate_order_status_query"),
+    HeuristicPattern(["recent", "order"], "_generate_recent_orders_query"),
 ]
 
 # Default fallback queries
@@ -5,6 +5,17 @@ Centralized configuration for SQL error correction patterns and rules.
 This serves as the single source of truth for SQL correction logic.
 """
 
+from typing import NamedTuple
+
+
+class LearnedPattern(NamedTuple):
+    """A regex rewrite learned from a previous SQL error."""
+
+    pattern: str
+    replacement: str
+    description: str
+
+
 # Common ambiguous columns that appear in multiple tables
 COMMON_AMBIGUOUS_COLUMNS = ["id", "name", "created_at", "updated_at"]
 
@@ -18,11 +29,11 @@ AGGREGATE_FUNCTIONS = ["SUM(", "COUNT(", "AVG(", "MAX(", "MIN("]
 LEARNED_PATTERNS = [
     # TODO: Add more specific patterns based on actual error analysis
     # Example pattern structure:
-    # {
-    #     "pattern": r"regex_pattern",
-    #     "replacement": "replacement_string",
-    #     "description": "Description of the fix"
-    # }
+    # LearnedPattern(
+    #     pattern=r"regex_pattern",
+    #     replacement="replacement_string",
+    #     description="Description of the fix",
+    # ),
 ]
 
 # SQL syntax patterns for detection and correction
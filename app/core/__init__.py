@@ -5,13 +5,15 @@ This package contains the main business logic for AI SQL generation,
 heuristic fallbacks, SQL corrections, and query utilities.
 """
 
-from .ai_handler import generate_sql_with_ai
+from .ai_handler import cache_generated_sql, generate_sql_with_ai, warm_up_llm
 from .heuristic_handler import heuristic_sql_fallback
 from .query_utils import determine_chart_type
 from .sql_corrections import fix_sql_syntax, learn_from_error
 
 __all__ = [
     "generate_sql_with_ai",
+    "cache_generated_sql",
+    "warm_up_llm",
     "heuristic_sql_fallback",
     "fix_sql_syntax",
     "learn_from_error",
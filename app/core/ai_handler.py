@@ -1,32 +1,100 @@
+import hashlib
+import logging
 import os
-from typing import Any, Dict, Tuple
-
-from langchain.schema import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-
-from ..data import find_similar_questions, find_similar_schema
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Any, Dict, List, Tuple
+
+from ..config import SEMANTIC_CACHE_CONFIG
+from ..data import (
+    EMBEDDINGS_ARE_SEMANTIC,
+    SemanticCache,
+    create_embedding,
+    find_similar_questions,
+    find_similar_schema,
+    get_cache,
+    normalize_question,
+    set_cache,
+)
 from ..enums import SQLSource
 from .heuristic_handler import heuristic_sql_fallback
 from .sql_corrections import fix_sql_syntax
 
-# LangChain imports (will be available after pip install)
-try:
-    # from langchain.prompts import ChatPromptTemplate
-    from langchain.schema import HumanMessage, SystemMessage
-    from langchain_openai import ChatOpenAI
-
-    from ..data import find_similar_questions, find_similar_schema
+logger = logging.getLogger(__name__)
 
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
-    print(
-        "Warning: LangChain not available. Install with: pip install langchain langchain-openai"
+# LangChain is imported on first use; only check that it is installed here
+LANGCHAIN_AVAILABLE = find_spec("langchain_openai") is not None
+if not LANGCHAIN_AVAILABLE:
+    logger.warning(
+        "LangChain not available. Install with: pip install langchain langchain-openai"
     )
 
 # Initialize OpenAI client (will be set up when API key is provided)
 _llm = None
 
+# Retrieved schema context for repeated or near-identical questions
+_schema_context_cache = SemanticCache(**SEMANTIC_CACHE_CONFIG["schema_context"])
+
+# (schema tables dict, fingerprint, prompt schemas) for the schema last seen;
+# get_schema_metadata hands out the same dict until it re-reads the database
+_schema_prompt_memo = None
+
+# Shared pool for overlapping the blocking vector-store lookups
+_retrieval_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
+# Optional markdown fences around the LLM's SQL, stripped in one match
+_MD_FENCE_RE = re.compile(r"(?:```sql)?(?:```)?(.*?)(?:```)?\Z", re.DOTALL)
+# Anchored prefix check that avoids lowercasing the whole statement
+_SELECT_RE = re.compile("select", re.IGNORECASE | re.ASCII)
+
+# Static instructions lead the system prompt so the provider can cache the
+# shared prefix; the schema and per-question context follow it. OpenAI only
+# caches prompts of 1024+ tokens, so very small schemas see no discount.
+_SYSTEM_PROMPT_RULES = """You are an expert SQL developer. Generate MySQL SQL queries based on natural language questions.
+
+Rules:
+1. Only generate SELECT queries (no INSERT, UPDATE, DELETE)
+2. Use proper JOINs when multiple tables are needed
+3. Include appropriate WHERE clauses for filtering
+4. Use meaningful column aliases
+5. Order results logically
+6. Limit results to reasonable amounts (use LIMIT when appropriate)
+7. Handle dates properly using MySQL date functions:
+   - "last year" = INTERVAL 12 MONTH
+   - "last quarter" = INTERVAL 3 MONTH
+   - "last month" = INTERVAL 1 MONTH
+   - "last 6 months" = INTERVAL 6 MONTH
+   - For quarterly data, ALWAYS use: CONCAT(YEAR(date_column), '-Q', QUARTER(date_column)) AS quarter
+   - For monthly data, use: DATE_FORMAT(date_column, '%Y-%m') AS month
+   - NEVER use DATE_FORMAT with '%Y-Q%q' as it creates malformed output like '2024-Qq'
+   - The correct quarterly format is: CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date))
+8. Use aggregate functions (SUM, COUNT, AVG) when appropriate
+9. When using CAST(), always specify the data type: CAST(expression AS DECIMAL(10,2))
+10. Ensure all parentheses are properly closed
+11. Test your SQL syntax before returning
+
+Return only the raw SQL query without any markdown formatting, code blocks, or explanations.
+
+Examples:
+- Basic query: SELECT * FROM table WHERE id = 1;
+- Quarterly data: SELECT CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date)) AS quarter, SUM(amount) FROM orders o GROUP BY quarter;
+- Monthly data: SELECT DATE_FORMAT(o.order_date, '%Y-%m') AS month, SUM(amount) FROM orders o GROUP BY month;
+"""
+
+# Above this size the full schema is left out when retrieved context is sent
+_SCHEMA_PROMPT_MAX_CHARS = 8000
+
+# Context placeholders sent when retrieval fails or finds nothing
+_UNAVAILABLE_SCHEMA_CONTEXT = "Schema embeddings not available - using full schema."
+_EMPTY_SCHEMA_CONTEXT = "No relevant schema context found."
+_NO_SCHEMA_CONTEXT = frozenset({_UNAVAILABLE_SCHEMA_CONTEXT, _EMPTY_SCHEMA_CONTEXT})
+
+# Generated SQL is cached per question and schema version
+_SQL_CACHE_PREFIX = "sqlgen:"
+_SQL_CACHE_TTL_SECONDS = 60 * 60  # 1 hour
+
 
 def _get_llm():
     """Get or create the OpenAI LLM instance."""
@@ -35,6 +103,8 @@ def _get_llm():
         if not LANGCHAIN_AVAILABLE:
             raise ImportError("LangChain not available. Install required packages.")
 
+        from langchain_openai import ChatOpenAI
+
         # Get API key from environment variable
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key or api_key == "your-openai-api-key-here":
@@ -47,10 +117,125 @@ def _get_llm():
             model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
             temperature=float(os.getenv("OPENAI_TEMPERATURE", "0.1")),
             api_key=api_key,
+            # Bound each call so one slow API response can't hold a request
+            # thread indefinitely; a timeout falls back to heuristic SQL
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "15")),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
         )
     return _llm
 
 
+def warm_up_llm() -> bool:
+    """Build the LLM client ahead of the first request.
+
+    Returns:
+        True if the client is ready, False if LangChain or the API key is missing
+    """
+    try:
+        _get_llm()
+    except (ImportError, ValueError) as e:
+        logger.info("LLM warm-up skipped: %s", e)
+        return False
+    return True
+
+
+def _schema_fingerprint(schema_info: Dict[str, Any]) -> str:
+    """Return a stable digest of the sorted table.column names in the schema."""
+    columns = sorted(
+        f"{table_name}.{column['Field']}"
+        for table_name, table_columns in schema_info.get("schema", {}).items()
+        for column in table_columns
+    )
+    return hashlib.blake2b("\n".join(columns).encode(), digest_size=16).hexdigest()
+
+
+def _compact_schema(schema_info: Dict[str, Any]) -> str:
+    """Render the schema as one "table(column type, ...)" line per table."""
+    lines = []
+    # Tables in name order so the prompt prefix is byte-stable across reloads
+    for table_name, table_columns in sorted(schema_info.get("schema", {}).items()):
+        columns = ", ".join(
+            f"{column['Field']} {column.get('Type', '')}".rstrip()
+            + (" PK" if column.get("Key") == "PRI" else "")
+            for column in table_columns
+        )
+        lines.append(f"{table_name}({columns})")
+    return "\n".join(lines)
+
+
+def _schema_prompt_parts(schema_info: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Return the schema fingerprint and the schema texts for the prompt.
+
+    These are rendered once per schema dict rather than once per request.
+    The second value is the schema to send alongside retrieved context and is
+    empty for large schemas; the third is sent when retrieval found nothing,
+    truncated to whole tables for large schemas.
+    """
+    global _schema_prompt_memo
+    tables = schema_info.get("schema", {})
+    memo = _schema_prompt_memo
+    if memo is None or memo[0] is not tables:
+        compact_schema = fallback_schema = _compact_schema(schema_info)
+        if len(compact_schema) > _SCHEMA_PROMPT_MAX_CHARS:
+            compact_schema = ""
+            truncated = fallback_schema[:_SCHEMA_PROMPT_MAX_CHARS]
+            fallback_schema = truncated.rpartition("\n")[0] or truncated
+        memo = (
+            tables,
+            _schema_fingerprint(schema_info),
+            compact_schema,
+            fallback_schema,
+        )
+        _schema_prompt_memo = memo
+    return memo[1], memo[2], memo[3]
+
+
+def _sql_cache_key(question: str, schema_info: Dict[str, Any]) -> str:
+    """Build the generated-SQL cache key for a question against a schema."""
+    fingerprint, _, _ = _schema_prompt_parts(schema_info)
+    digest = hashlib.blake2b(
+        f"{normalize_question(question)}|{fingerprint}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return f"{_SQL_CACHE_PREFIX}{digest}"
+
+
+def _format_schema_context(
+    similar_schema: List[Dict[str, Any]], similar_questions: List[Dict[str, Any]]
+) -> str:
+    """Format retrieved schema elements and similar questions for the prompt."""
+    context_parts = []
+    append = context_parts.append
+
+    # Add relevant schema information
+    if similar_schema:
+        append("Relevant Schema Elements:")
+        for item in similar_schema:
+            document = item.get("document")
+            if not document:
+                continue
+            append(f"- {document}")
+            metadata = item.get("metadata")
+            if metadata:
+                table_name = metadata.get("table_name")
+                if table_name:
+                    append(f"  Table: {table_name}")
+                columns = metadata.get("columns")
+                if columns:
+                    append(f"  Columns: {', '.join(columns)}")
+
+    # Add similar questions for context
+    if similar_questions:
+        append("\nSimilar Questions:")
+        for item in similar_questions:
+            question = item.get("question")
+            sql = item.get("sql")
+            if question and sql:
+                append(f"- Q: {question}\n  SQL: {sql}")
+
+    return "\n".join(context_parts) if context_parts else _EMPTY_SCHEMA_CONTEXT
+
+
 def _get_relevant_schema_context(question: str) -> str:
     """
     Get relevant schema context using embeddings to enhance AI prompts.
@@ -61,52 +246,229 @@ def _get_relevant_schema_context(question: str) -> str:
     Returns:
         Formatted string with relevant schema information
     """
-    try:
+    # Exact repeats skip embedding entirely
+    cache_key = normalize_question(question)
+    cached_context = _schema_context_cache.get(cache_key)
+    if cached_context is not None:
+        return cached_context
 
-        # Get similar schema elements
-        similar_schema = find_similar_schema(question, n_results=5)
-
-        # Get similar questions for context
-        similar_questions = find_similar_questions(question, n_results=3)
-
-        context_parts = []
-
-        # Add relevant schema information
-        if similar_schema:
-            context_parts.append("Relevant Schema Elements:")
-            for item in similar_schema:
-                if item.get("document"):
-                    context_parts.append(f"- {item['document']}")
-                    if item.get("metadata"):
-                        metadata = item["metadata"]
-                        if metadata.get("table_name"):
-                            context_parts.append(f"  Table: {metadata['table_name']}")
-                        if metadata.get("columns"):
-                            context_parts.append(
-                                f"  Columns: {', '.join(metadata['columns'])}"
-                            )
-
-        # Add similar questions for context
-        if similar_questions:
-            context_parts.append("\nSimilar Questions:")
-            for item in similar_questions:
-                question = item.get("question")
-                sql = item.get("sql")
-                if question and sql:
-                    context_parts.append(f"- Q: {question}")
-                    context_parts.append(f"  SQL: {sql}")
-
-        return (
-            "\n".join(context_parts)
-            if context_parts
-            else "No relevant schema context found."
+    try:
+        question_embedding = create_embedding(question)
+        # Near-identical questions reuse the context retrieved for the first
+        # one; hash embeddings would match unrelated questions instead
+        if EMBEDDINGS_ARE_SEMANTIC:
+            cached_context = _schema_context_cache.get_similar(question_embedding)
+            if cached_context is not None:
+                return cached_context
+
+        # Run the schema and similar-question lookups concurrently
+        schema_future = _retrieval_executor.submit(
+            find_similar_schema, question, 5, question_embedding
+        )
+        similar_questions = find_similar_questions(
+            question, n_results=3, embedding=question_embedding
         )
+        similar_schema = schema_future.result()
+
+        context = _format_schema_context(similar_schema, similar_questions)
+        _schema_context_cache.set(cache_key, question_embedding, context)
+        return context
 
     except Exception as e:
         # Fallback if embeddings are not available
-        if os.getenv("DEBUG") == "true":
-            print(f"Schema embeddings not available: {e}")
-        return "Schema embeddings not available - using full schema."
+        logger.warning("Schema embeddings not available: %s", e)
+        return _UNAVAILABLE_SCHEMA_CONTEXT
+
+
+@lru_cache(maxsize=8)
+def _prompt_prefix(compact_schema: str) -> str:
+    """Return the static rules plus the schema block, built once per schema."""
+    if not compact_schema:
+        return _SYSTEM_PROMPT_RULES
+    return f"{_SYSTEM_PROMPT_RULES}\nDatabase Schema:\n{compact_schema}\n"
+
+
+@lru_cache(maxsize=128)
+def _system_message(compact_schema: str, relevant_schema_context: str):
+    """Build the system message, reusing it for repeated schema context."""
+    from langchain_core.messages import SystemMessage
+
+    # Only the retrieved context varies per question; it goes after the
+    # shared prefix so providers can reuse their cached prompt prefix
+    return SystemMessage(
+        content=f"{_prompt_prefix(compact_schema)}\n"
+        f"Most Relevant Schema Context for this question:\n{relevant_schema_context}"
+    )
+
+
+def _build_messages(
+    question: str, schema_info: Dict[str, Any], relevant_schema_context: str
+) -> list:
+    """Build the system and user messages for SQL generation."""
+    from langchain_core.messages import HumanMessage
+
+    _, compact_schema, fallback_schema = _schema_prompt_parts(schema_info)
+    # Without retrieved context the prompt must carry the schema itself
+    if relevant_schema_context in _NO_SCHEMA_CONTEXT:
+        compact_schema = fallback_schema
+
+    messages = [
+        _system_message(compact_schema, relevant_schema_context),
+        HumanMessage(content=f"Generate SQL for this question: {question}"),
+    ]
+
+    return messages
+
+
+class _StatementBuffer:
+    """Accumulate streamed SQL text until the first complete statement.
+
+    A statement is complete at the first ';' outside string literals,
+    quoted identifiers, comments and parentheses, or at the markdown fence
+    closing the code block; anything the model emits after it (commentary)
+    is dropped. A leading ``` fence opens the code block rather than a
+    quoted identifier. Streaming also stops as soon as the text can be seen
+    not to start with SELECT, which _parse_sql_response rejects.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._depth = 0
+        # Open quote character, "--" inside a line comment, "/*" inside a
+        # block comment, or None in plain SQL
+        self._state = None
+        # Previous character, for two-character tokens split across chunks
+        self._prev = ""
+        # Backticks seen in a row in plain SQL; three make a markdown fence
+        self._ticks = 0
+        # Only whitespace so far, so a fence here opens the code block
+        self._leading = True
+        self._start_checked = False
+
+    def feed(self, text: str) -> bool:
+        """Append a streamed chunk; return True once no more text is needed."""
+        state, prev, ticks = self._state, self._prev, self._ticks
+        for index, char in enumerate(text):
+            if state is None:
+                if char == "`":
+                    ticks += 1
+                    if ticks == 3:
+                        ticks = 0
+                        if not self._leading:
+                            # Closing fence; the rest is commentary
+                            self._parts.append(text[: index + 1])
+                            return True
+                        self._leading = False
+                    prev = char
+                    continue
+                if ticks or not char.isspace():
+                    self._leading = False
+                if ticks == 1:
+                    # A lone backtick opened a quoted identifier
+                    state, prev, ticks = "`", char, 0
+                    continue
+                ticks = 0
+                if char in "'\"":
+                    state = char
+                elif char == "#" or (char == "-" and prev == "-"):
+                    state = "--"
+                elif char == "*" and prev == "/":
+                    state = "/*"
+                    char = ""  # the '*' can't also close the comment
+                elif char == "(":
+                    self._depth += 1
+                elif char == ")":
+                    self._depth -= 1
+                elif char == ";" and self._depth <= 0:
+                    self._parts.append(text[: index + 1])
+                    return True
+            elif state == "--":
+                if char == "\n":
+                    state = None
+            elif state == "/*":
+                if char == "/" and prev == "*":
+                    state = None
+                    char = ""
+            elif prev == "\\":
+                char = ""  # escaped character; MySQL backslash escapes
+            elif char == state:
+                state = None
+            prev = char
+        self._state, self._prev, self._ticks = state, prev, ticks
+        self._parts.append(text)
+        return not self._start_checked and self._starts_without_select()
+
+    def _starts_without_select(self) -> bool:
+        """Return True if the text so far cannot become a SELECT query."""
+        head = self.text.lstrip()
+        # Leading fences are only known once the longest pair could be present
+        if len(head) < len("```sql```"):
+            return False
+        # Same fences, in the same order, as _MD_FENCE_RE strips
+        for fence in ("```sql", "```"):
+            if head.startswith(fence):
+                head = head[len(fence) :]
+        head = head.lstrip()
+        if len(head) < len("select"):
+            return False
+        self._start_checked = True
+        return not _SELECT_RE.match(head)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def _stream_sql(llm, messages: list) -> str:
+    """Stream the completion and stop as soon as a full statement has arrived."""
+    buffer = _StatementBuffer()
+    stream = llm.stream(messages)
+    try:
+        for chunk in stream:
+            if buffer.feed(chunk.content):
+                break
+    finally:
+        # Closing the generator cancels the remaining generation
+        stream.close()
+    return buffer.text
+
+
+def _parse_sql_response(content: str) -> Tuple[str, bool]:
+    """Clean, validate and correct the SQL returned by the LLM.
+
+    Returns:
+        Tuple of (sql, was_corrected)
+    """
+    # Clean up markdown code blocks if present
+    sql = _MD_FENCE_RE.match(content.strip()).group(1).strip()
+
+    # Basic safety check
+    if not _SELECT_RE.match(sql):
+        logger.warning("SQL doesn't start with SELECT: %.50s...", sql)
+        logger.debug("AI generated SQL (ERROR): %s", content)
+        raise ValueError("Generated SQL is not a SELECT query")
+
+    # Fix common SQL syntax errors
+    sql, corrected = fix_sql_syntax(sql)
+    if corrected:
+        logger.debug("SQL was corrected during generation")
+
+    # Basic SQL syntax validation
+    if sql.count("(") != sql.count(")"):
+        raise ValueError("Unmatched parentheses in SQL query")
+
+    return sql, corrected
+
+
+def cache_generated_sql(
+    question: str, schema_info: Dict[str, Any], sql: str, corrected: bool
+) -> None:
+    """Cache AI-generated SQL for reuse once it has run successfully."""
+    set_cache(
+        _sql_cache_key(question, schema_info),
+        (sql, corrected),
+        ttl=_SQL_CACHE_TTL_SECONDS,
+    )
 
 
 def generate_sql_with_ai(
@@ -115,99 +477,27 @@ def generate_sql_with_ai(
     """Generate SQL using OpenAI based on the question and schema."""
     if not LANGCHAIN_AVAILABLE:
         # Fallback to heuristic approach if LangChain not available
-        return heuristic_sql_fallback(question)
+        return heuristic_sql_fallback(question), False, SQLSource.HEURISTIC_FALLBACK
+
+    # Identical questions against the same schema reuse the generated SQL
+    cache_key = _sql_cache_key(question, schema_info)
+    cached = get_cache(cache_key)
+    if cached:
+        sql, corrected = cached
+        return sql, corrected, SQLSource.CACHE
 
     try:
         llm = _get_llm()
 
         # Get relevant schema context using embeddings
         relevant_schema_context = _get_relevant_schema_context(question)
+        messages = _build_messages(question, schema_info, relevant_schema_context)
 
-        # Combine full schema with relevant context
-        enhanced_schema_info = f"""
-        Full Database Schema:
-        {schema_info}
-        
-        Most Relevant Schema Context for this question:
-        {relevant_schema_context}
-        """
-
-        # Create a comprehensive prompt for SQL generation
-        system_prompt = f"""
-        You are an expert SQL developer. Generate MySQL SQL queries based on natural language questions.
-        
-        Database Schema:
-        {enhanced_schema_info}
-        
-        Rules:
-        1. Only generate SELECT queries (no INSERT, UPDATE, DELETE)
-        2. Use proper JOINs when multiple tables are needed
-        3. Include appropriate WHERE clauses for filtering
-        4. Use meaningful column aliases
-        5. Order results logically
-        6. Limit results to reasonable amounts (use LIMIT when appropriate)
-        7. Handle dates properly using MySQL date functions:
-           - "last year" = INTERVAL 12 MONTH
-           - "last quarter" = INTERVAL 3 MONTH  
-           - "last month" = INTERVAL 1 MONTH
-           - "last 6 months" = INTERVAL 6 MONTH
-           - For quarterly data, ALWAYS use: CONCAT(YEAR(date_column), '-Q', QUARTER(date_column)) AS quarter
-           - For monthly data, use: DATE_FORMAT(date_column, '%Y-%m') AS month
-           - NEVER use DATE_FORMAT with '%Y-Q%q' as it creates malformed output like '2024-Qq'
-           - The correct quarterly format is: CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date))
-        8. Use aggregate functions (SUM, COUNT, AVG) when appropriate
-        9. When using CAST(), always specify the data type: CAST(expression AS DECIMAL(10,2))
-        10. Ensure all parentheses are properly closed
-        11. Test your SQL syntax before returning
-        
-        Return only the raw SQL query without any markdown formatting, code blocks, or explanations.
-        
-        Examples:
-        - Basic query: SELECT * FROM table WHERE id = 1;
-        - Quarterly data: SELECT CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date)) AS quarter, SUM(amount) FROM orders o GROUP BY quarter;
-        - Monthly data: SELECT DATE_FORMAT(o.order_date, '%Y-%m') AS month, SUM(amount) FROM orders o GROUP BY month;
-        """
-
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Generate SQL for this question: {question}"),
-        ]
-
-        response = llm.invoke(messages)
-        sql = response.content.strip()
-
-        # Debug print for AI generated SQL (only on error)
-        if os.getenv(
-            "DEBUG", "false"
-        ).lower() == "true" and not sql.strip().upper().startswith("SELECT"):
-            print(f"AI generated SQL (ERROR): {sql}")
-
-        # Clean up markdown code blocks if present
-        if sql.startswith("```sql"):
-            sql = sql[6:]  # Remove ```sql
-        if sql.startswith("```"):
-            sql = sql[3:]  # Remove ```
-        if sql.endswith("```"):
-            sql = sql[:-3]  # Remove trailing ```
-        sql = sql.strip()
-
-        # Basic safety check
-        if not sql.lower().startswith("select"):
-            print(f"SQL doesn't start with SELECT: {sql[:50]}...")
-            raise ValueError("Generated SQL is not a SELECT query")
-
-        # Fix common SQL syntax errors
-        sql, corrected = fix_sql_syntax(sql)
-        if corrected and os.getenv("DEBUG", "false").lower() == "true":
-            print("SQL was corrected during generation")
-
-        # Basic SQL syntax validation
-        if sql.count("(") != sql.count(")"):
-            raise ValueError("Unmatched parentheses in SQL query")
+        sql, corrected = _parse_sql_response(_stream_sql(llm, messages))
 
         return sql, corrected, SQLSource.AI
 
     except Exception as e:
-        print(f"AI SQL generation failed: {e}")
+        logger.warning("AI SQL generation failed: %s", e)
         # Fallback to heuristic approach
         return heuristic_sql_fallback(question), False, SQLSource.HEURISTIC_FALLBACK
@@ -1,83 +1,122 @@
 import re
 
+# Look for patterns like "top 5", "best 10", "first 3", in priority order;
+# group N holds the number for the Nth pattern
+_LIMIT_RE = re.compile(
+    r"top\s+(\d+)|best\s+(\d+)|first\s+(\d+)|last\s+(\d+)"
+    r"|(\d+)\s+products?|(\d+)\s+customers?",
+    re.IGNORECASE | re.ASCII,
+)
+
+# Relative periods; groups 1-4 are phrases with a fixed month count and
+# group 5 holds N from "last N months"
+_MONTHS_RE = re.compile(
+    r"(?:last|past) (?:(year)|(quarter)|(month)|(6 months))"
+    r"|\blast\s+(\d{1,2})\s+months?\b",
+    re.IGNORECASE | re.ASCII,
+)
+_PERIOD_MONTHS = {1: 12, 2: 3, 3: 1, 4: 6}
+
+
+# Parameterized SQL is filled in with a single str.format call
+_REVENUE_SQL = (
+    "SELECT p.name AS product, "
+    "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS revenue "
+    "FROM order_items oi "
+    "JOIN products p ON p.id = oi.product_id "
+    "JOIN orders o ON o.id = oi.order_id "
+    "WHERE o.status <> 'CANCELLED' AND "
+    "o.order_date >= DATE_SUB(CURDATE(), INTERVAL {months} MONTH) "
+    "GROUP BY p.name ORDER BY revenue DESC LIMIT {limit};"
+)
+_CUSTOMER_SQL = (
+    "SELECT c.name AS customer, "
+    "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_value, "
+    "COUNT(DISTINCT o.id) AS order_count "
+    "FROM customers c "
+    "JOIN orders o ON o.customer_id = c.id "
+    "JOIN order_items oi ON oi.order_id = o.id "
+    "WHERE o.status <> 'CANCELLED' "
+    "GROUP BY c.id, c.name "
+    "ORDER BY total_value DESC LIMIT {limit};"
+)
+_RECENT_ORDERS_SQL = (
+    "SELECT o.id, c.name AS customer, o.order_date, o.status, "
+    "CAST(o.total_amount AS DECIMAL(10,2)) AS total_amount "
+    "FROM orders o "
+    "JOIN customers c ON c.id = o.customer_id "
+    "ORDER BY o.order_date DESC LIMIT {limit};"
+)
+
+# Queries whose only parameter is the month count are rendered for every
+# count _months_from_question can return (1..24) and indexed by it
+_MONTHS_RANGE = range(25)
+_MONTHLY_SALES_SQL = tuple(
+    "SELECT DATE_FORMAT(o.order_date, '%Y-%m') AS month, "
+    "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_sales "
+    "FROM orders o "
+    "JOIN order_items oi ON oi.order_id = o.id "
+    "WHERE o.status <> 'CANCELLED' AND "
+    f"o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
+    "GROUP BY month ORDER BY month;"
+    for n in _MONTHS_RANGE
+)
+_QUARTERLY_SALES_SQL = tuple(
+    "SELECT CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date)) AS quarter, "
+    "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_sales "
+    "FROM orders o "
+    "JOIN order_items oi ON oi.order_id = o.id "
+    "WHERE o.status <> 'CANCELLED' AND "
+    f"o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
+    "GROUP BY YEAR(o.order_date), QUARTER(o.order_date) "
+    "ORDER BY YEAR(o.order_date), QUARTER(o.order_date);"
+    for n in _MONTHS_RANGE
+)
+_NEW_CUSTOMER_SQL = tuple(
+    "SELECT c.name AS customer, c.email, o.order_date AS first_order "
+    "FROM customers c "
+    "JOIN orders o ON o.customer_id = c.id "
+    f"WHERE o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
+    "GROUP BY c.id, c.name, c.email "
+    "ORDER BY first_order DESC;"
+    for n in _MONTHS_RANGE
+)
+
 
 def _generate_revenue_query(q: str) -> str:
     """Generate revenue-based queries."""
     n = _months_from_question(q, default=3)
     limit = _extract_limit(q, default=10)
 
-    return (
-        "SELECT p.name AS product, "
-        "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS revenue "
-        "FROM order_items oi "
-        "JOIN products p ON p.id = oi.product_id "
-        "JOIN orders o ON o.id = oi.order_id "
-        "WHERE o.status <> 'CANCELLED' AND "
-        f"o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
-        "GROUP BY p.name ORDER BY revenue DESC LIMIT {limit};"
-    ).format(limit=limit)
+    return _REVENUE_SQL.format(months=n, limit=limit)
 
 
 def _generate_monthly_sales_query(q: str) -> str:
     """Generate monthly sales queries."""
     n = _months_from_question(q, default=6)
 
-    return (
-        "SELECT DATE_FORMAT(o.order_date, '%Y-%m') AS month, "
-        "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_sales "
-        "FROM orders o "
-        "JOIN order_items oi ON oi.order_id = o.id "
-        "WHERE o.status <> 'CANCELLED' AND "
-        f"o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
-        "GROUP BY month ORDER BY month;"
-    )
+    return _MONTHLY_SALES_SQL[n]
 
 
 def _generate_quarterly_sales_query(q: str) -> str:
     """Generate quarterly sales queries."""
     n = _months_from_question(q, default=12)  # Default to 12 months for quarterly data
 
-    return (
-        "SELECT CONCAT(YEAR(o.order_date), '-Q', QUARTER(o.order_date)) AS quarter, "
-        "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_sales "
-        "FROM orders o "
-        "JOIN order_items oi ON oi.order_id = o.id "
-        "WHERE o.status <> 'CANCELLED' AND "
-        f"o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
-        "GROUP BY YEAR(o.order_date), QUARTER(o.order_date) "
-        "ORDER BY YEAR(o.order_date), QUARTER(o.order_date);"
-    )
+    return _QUARTERLY_SALES_SQL[n]
 
 
 def _generate_customer_query(q: str) -> str:
     """Generate customer-based queries."""
     limit = _extract_limit(q, default=10)
 
-    return (
-        "SELECT c.name AS customer, "
-        "CAST(SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) AS DECIMAL(10,2)) AS total_value, "
-        "COUNT(DISTINCT o.id) AS order_count "
-        "FROM customers c "
-        "JOIN orders o ON o.customer_id = c.id "
-        "JOIN order_items oi ON oi.order_id = o.id "
-        "WHERE o.status <> 'CANCELLED' "
-        "GROUP BY c.id, c.name "
-        "ORDER BY total_value DESC LIMIT {limit};"
-    ).format(limit=limit)
+    return _CUSTOMER_SQL.format(limit=limit)
 
 
 def _generate_new_customer_query(q: str) -> str:
     """Generate new customer queries."""
     n = _months_from_question(q, default=1)
 
-    return (
-        "SELECT c.name AS customer, c.email, o.order_date AS first_order "
-        "FROM customers c "
-        "JOIN orders o ON o.customer_id = c.id "
-        f"WHERE o.order_date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH) "
-        "GROUP BY c.id, c.name, c.email "
-        "ORDER BY first_order DESC;"
-    )
+    return _NEW_CUSTOMER_SQL[n]
 
 
 def _generate_inventory_query(q: str) -> str:
@@ -119,34 +158,19 @@ def _generate_recent_orders_query(q: str) -> str:
     """Generate recent orders queries."""
     limit = _extract_limit(q, default=10)
 
-    return (
-        "SELECT o.id, c.name AS customer, o.order_date, o.status, "
-        "CAST(o.total_amount AS DECIMAL(10,2)) AS total_amount "
-        "FROM orders o "
-        "JOIN customers c ON c.id = o.customer_id "
-        "ORDER BY o.order_date DESC LIMIT {limit};"
-    ).format(limit=limit)
+    return _RECENT_ORDERS_SQL.format(limit=limit)
 
 
 def _extract_limit(q: str, default: int = 10) -> int:
     """Extract limit number from question."""
 
-    # Look for patterns like "top 5", "best 10", "first 3"
-    patterns = [
-        r"top\s+(\d+)",
-        r"best\s+(\d+)",
-        r"first\s+(\d+)",
-        r"last\s+(\d+)",
-        r"(\d+)\s+products?",
-        r"(\d+)\s+customers?",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, q)
-        if match:
-            return int(match.group(1))
+    # Earlier patterns take priority over earlier positions in the question
+    best = None
+    for match in _LIMIT_RE.finditer(q):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
 
-    return default
+    return int(best.group(best.lastindex)) if best else default
 
 
 def _months_from_question(q: str, default=3):
@@ -154,19 +178,15 @@ def _months_from_question(q: str, default=3):
     if not q or not isinstance(q, str):
         return default
 
-    q_lower = q.lower()
+    # Lower groups win regardless of position, so named periods beat "last N months"
+    best = None
+    for match in _MONTHS_RE.finditer(q):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
 
-    # Handle specific time periods
-    if "last year" in q_lower or "past year" in q_lower:
-        return 12
-    elif "last quarter" in q_lower or "past quarter" in q_lower:
-        return 3
-    elif "last month" in q_lower or "past month" in q_lower:
-        return 1
-    elif "last 6 months" in q_lower or "past 6 months" in q_lower:
-        return 6
+    if best is not None and best.lastindex in _PERIOD_MONTHS:
+        return _PERIOD_MONTHS[best.lastindex]
 
     # Handle "last X months" pattern
-    m = re.search(r"\blast\s+(\d{1,2})\s+months?\b", q_lower)
-    n = int(m.group(1)) if m else default
+    n = int(best.group(5)) if best else default
     return max(1, min(n, 24))  # clamp 1..24
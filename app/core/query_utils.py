@@ -1,4 +1,6 @@
-from typing import Any, List
+import re
+from collections import deque
+from typing import Any, List, Pattern
 
 from ..config import (
     CATEGORICAL_KEYWORDS,
@@ -12,6 +14,55 @@ from ..config import (
 from ..enums import ChartType
 
 
+def _keyword_regex(keywords: List[str]) -> Pattern[str]:
+    """Compile a keyword list into a single substring alternation."""
+    return re.compile("|".join(re.escape(keyword) for keyword in sorted(set(keywords))))
+
+
+# Each keyword class is matched with one C-level scan instead of a Python loop
+_TIME_KEYWORDS_RE = _keyword_regex(TIME_KEYWORDS)
+_LINE_CHART_KEYWORDS_RE = _keyword_regex(LINE_CHART_KEYWORDS)
+_SCATTER_CHART_KEYWORDS_RE = _keyword_regex(SCATTER_CHART_KEYWORDS)
+_PIE_CHART_KEYWORDS_RE = _keyword_regex(PIE_CHART_KEYWORDS)
+_CATEGORICAL_KEYWORDS_RE = _keyword_regex(CATEGORICAL_KEYWORDS)
+_TIME_PATTERNS_RE = _keyword_regex(TIME_PATTERNS)
+
+# Unique-value counts are only compared against these thresholds, so counting
+# can stop as soon as the largest one is exceeded
+_UNIQUE_VALUES_CAP = max(
+    CHART_THRESHOLDS["quarter_max_points"],
+    CHART_THRESHOLDS["pie_max_categories"],
+    CHART_THRESHOLDS["scatter_min_unique_values"],
+    6,  # categorical pie cutoff
+)
+
+
+def _count_unique(values: List[Any], cap: int = _UNIQUE_VALUES_CAP) -> int:
+    """Count distinct values, returning cap + 1 as soon as cap is exceeded."""
+    seen = set()
+    add = seen.add
+    try:
+        for value in values:
+            add(value)
+            if len(seen) > cap:
+                return cap + 1
+    except TypeError:
+        # Unhashable values fall back to their string form
+        return _count_unique([str(value) for value in values], cap)
+    return len(seen)
+
+
+def _all_numeric(values: List[Any]) -> bool:
+    """Return True if every value coerces to float, stopping at the first miss."""
+    try:
+        # Drain map() into a zero-length deque so the loop runs in C
+        deque(map(float, values), maxlen=0)
+    except (TypeError, ValueError):
+        # None raises TypeError, so missing values count as non-numeric
+        return False
+    return True
+
+
 def determine_chart_type(
     x_data: List[Any], y_data: List[Any], x_name: str, y_name: str, question: str
 ) -> str:
@@ -33,12 +84,13 @@ def determine_chart_type(
     x_name_lower = x_name.lower()
     question_lower = question.lower()
 
-    # Calculate unique values for analysis
-    unique_x_values = len(set(str(x) for x in x_data))
-    unique_y_values = len(set(str(y) for y in y_data))
+    # Calculate unique values for analysis (capped; Y is only needed for scatter)
+    unique_x_values = _count_unique(x_data)
+    # Whether Y is numeric is needed by both the pie and scatter checks
+    y_numeric = None
 
     # 1. Time series analysis
-    if any(keyword in x_name_lower for keyword in TIME_KEYWORDS):
+    if _TIME_KEYWORDS_RE.search(x_name_lower):
         # For quarterly data with few points, prefer bar chart
         if (
             "quarter" in x_name_lower
@@ -49,13 +101,13 @@ def determine_chart_type(
         return ChartType.LINE.value
 
     # 2. Question context analysis
-    if any(keyword in question_lower for keyword in LINE_CHART_KEYWORDS):
+    if _LINE_CHART_KEYWORDS_RE.search(question_lower):
         return ChartType.LINE.value
 
-    if any(keyword in question_lower for keyword in SCATTER_CHART_KEYWORDS):
+    if _SCATTER_CHART_KEYWORDS_RE.search(question_lower):
         return ChartType.SCATTER.value
 
-    if any(keyword in question_lower for keyword in PIE_CHART_KEYWORDS):
+    if _PIE_CHART_KEYWORDS_RE.search(question_lower):
         return ChartType.PIE.value
 
     # 3. Data distribution analysis
@@ -68,36 +120,28 @@ def determine_chart_type(
         <= CHART_THRESHOLDS["pie_max_categories"]
     ):
         # Check if Y values are numeric (for pie chart)
-        try:
-            numeric_y = [float(y) for y in y_data if y is not None]
-            if len(numeric_y) == len(y_data):  # All Y values are numeric
-                # Check if X data contains time patterns
-                x_data_lower = [str(x).lower() for x in x_data]
-                has_time_pattern = any(
-                    pattern in " ".join(x_data_lower) for pattern in TIME_PATTERNS
-                )
-
-                if not has_time_pattern:
-                    return ChartType.PIE.value
-        except (ValueError, TypeError):
-            pass
+        y_numeric = _all_numeric(y_data)
+        if y_numeric:
+            # Check if X data contains time patterns
+            x_data_lower = " ".join(map(str, x_data)).lower()
+            has_time_pattern = _TIME_PATTERNS_RE.search(x_data_lower) is not None
+
+            if not has_time_pattern:
+                return ChartType.PIE.value
 
     # Scatter plot for correlation analysis
     if (
         unique_x_values > CHART_THRESHOLDS["scatter_min_unique_values"]
-        and unique_y_values > CHART_THRESHOLDS["scatter_min_unique_values"]
+        and _count_unique(y_data) > CHART_THRESHOLDS["scatter_min_unique_values"]
     ):
-        try:
-            # Check if both X and Y are numeric
-            numeric_x = [float(x) for x in x_data if x is not None]
-            numeric_y = [float(y) for y in y_data if y is not None]
-            if len(numeric_x) == len(x_data) and len(numeric_y) == len(y_data):
-                return ChartType.SCATTER.value
-        except (ValueError, TypeError):
-            pass
+        # Check if both X and Y are numeric
+        if y_numeric is None:
+            y_numeric = _all_numeric(y_data)
+        if y_numeric and _all_numeric(x_data):
+            return ChartType.SCATTER.value
 
     # 4. Column name analysis
-    if any(keyword in x_name_lower for keyword in CATEGORICAL_KEYWORDS):
+    if _CATEGORICAL_KEYWORDS_RE.search(x_name_lower):
         if unique_x_values <= 6:
             return ChartType.PIE.value
         else:
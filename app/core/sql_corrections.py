@@ -1,6 +1,6 @@
 import os
 import re
-from typing import List, Tuple
+from typing import List, Set, Tuple
 
 from ..config import (
     AGGREGATE_FUNCTIONS,
@@ -10,6 +10,59 @@ from ..config import (
     SQL_THRESHOLDS,
 )
 
+# Resolved once at import; restart the server to toggle debug output
+_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+# Compile correction patterns once at import; SQL keywords are case-insensitive
+_SQL_PATTERN_FLAGS = {"select_clause": re.IGNORECASE | re.DOTALL}
+_SQL_REGEXES = {
+    name: re.compile(pattern, _SQL_PATTERN_FLAGS.get(name, re.IGNORECASE))
+    for name, pattern in SQL_PATTERNS.items()
+    if name != "bare_column"
+}
+_BARE_COLUMN_REGEXES = {
+    column: re.compile(SQL_PATTERNS["bare_column"].format(column=column), re.IGNORECASE)
+    for column in COMMON_AMBIGUOUS_COLUMNS
+}
+_LEARNED_REGEXES = [
+    (
+        re.compile(pattern_info.pattern, re.IGNORECASE),
+        pattern_info.replacement,
+        pattern_info.description,
+    )
+    for pattern_info in LEARNED_PATTERNS
+]
+
+# SQL keywords the detection checks need, found in one case-insensitive scan
+_SQL_KEYWORDS_RE = re.compile(
+    r"(?P<JOIN>\bJOIN\b)|(?P<ON>\bON\b)|(?P<GROUP_BY>\bGROUP\s+BY\b)"
+    r"|(?P<SELECT>\bSELECT\b)|(?P<AGGREGATE>"
+    + "|".join(re.escape(func) for func in AGGREGATE_FUNCTIONS)
+    + ")",
+    re.IGNORECASE,
+)
+
+_FROM_WITH_ALIAS_RE = re.compile(r"FROM\s+\w+\s+\w+", re.IGNORECASE)
+_WORD_RE = re.compile(r"\b\w+\b")
+_FROM_ORDERS_RE = re.compile(r"(FROM\s+orders\s+o)", re.IGNORECASE)
+
+# Revenue expression used to replace columns that do not exist on orders
+_REVENUE_EXPRESSION = "oi.qty * oi.unit_price * (1 - oi.discount_pct/100)"
+_ORDER_ITEMS_JOIN = " JOIN order_items oi ON oi.order_id = o.id"
+
+# Local rewrites fused into a single alternation so the SQL is scanned once.
+# Order matters: COUNT(JOIN.id) must win over the generic JOIN.column match.
+_FUSED_REWRITE_PATTERNS = [
+    ("join_id_reference", SQL_PATTERNS["join_id_reference"]),
+    ("join_reference", SQL_PATTERNS["join_reference"]),
+    ("total_amount", r"o\.total_amount"),
+    ("missing_column", r"o\.(?:revenue|sales|amount)"),
+]
+_FUSED_REWRITE_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _FUSED_REWRITE_PATTERNS),
+    re.IGNORECASE,
+)
+
 
 def fix_sql_syntax(sql: str) -> Tuple[str, bool]:
     """Fix common SQL syntax errors using pattern-based corrections.
@@ -19,7 +72,7 @@ def fix_sql_syntax(sql: str) -> Tuple[str, bool]:
     """
     fixes_applied = []
 
-    # 1. Fix CAST syntax errors
+    # 1. Fix CAST syntax errors, before aliases are added to bare columns
     sql, cast_fixes = _fix_cast_syntax(sql)
     fixes_applied.extend(cast_fixes)
 
@@ -27,33 +80,32 @@ def fix_sql_syntax(sql: str) -> Tuple[str, bool]:
     sql, ambiguous_fixes = _fix_ambiguous_columns(sql)
     fixes_applied.extend(ambiguous_fixes)
 
+    # Keywords present in the query, shared by the detection checks below
+    keywords = _find_sql_keywords(sql)
+
     # 3. Fix missing table aliases
-    sql, alias_fixes = _fix_missing_aliases(sql)
+    sql, alias_fixes = _fix_missing_aliases(sql, keywords)
     fixes_applied.extend(alias_fixes)
 
     # 4. Fix JOIN syntax issues
-    sql, join_fixes = _fix_join_syntax(sql)
+    sql, join_fixes = _fix_join_syntax(sql, keywords)
     fixes_applied.extend(join_fixes)
 
     # 5. Fix GROUP BY issues
-    sql, groupby_fixes = _fix_groupby_syntax(sql)
+    sql, groupby_fixes = _fix_groupby_syntax(sql, keywords)
     fixes_applied.extend(groupby_fixes)
 
-    # 6. Fix invalid JOIN references
-    sql, join_ref_fixes = _fix_invalid_join_references(sql)
-    fixes_applied.extend(join_ref_fixes)
-
-    # 7. Fix missing column references
-    sql, column_fixes = _fix_missing_columns(sql)
-    fixes_applied.extend(column_fixes)
+    # 6. Fix invalid JOIN references and missing columns in one scan
+    sql, rewrite_fixes = _apply_fused_rewrites(sql)
+    fixes_applied.extend(rewrite_fixes)
 
-    # 8. Apply learned error patterns
+    # 7. Apply learned error patterns
     sql, learned_fixes = _apply_learned_patterns(sql)
     fixes_applied.extend(learned_fixes)
 
     # Debug output if fixes were applied
     fixes_were_applied = len(fixes_applied) > 0
-    if fixes_were_applied and os.getenv("DEBUG", "false").lower() == "true":
+    if fixes_were_applied and _DEBUG:
         print(f"SQL fixes applied: {fixes_applied}")
 
     return sql, fixes_were_applied
@@ -64,15 +116,10 @@ def _apply_learned_patterns(sql: str) -> Tuple[str, List[str]]:
 
     fixes = []
 
-    for pattern_info in LEARNED_PATTERNS:
-        if re.search(pattern_info["pattern"], sql, re.IGNORECASE):
-            sql = re.sub(
-                pattern_info["pattern"],
-                pattern_info["replacement"],
-                sql,
-                flags=re.IGNORECASE,
-            )
-            fixes.append(pattern_info["description"])
+    for regex, replacement, description in _LEARNED_REGEXES:
+        sql, count = regex.subn(replacement, sql)
+        if count:
+            fixes.append(description)
 
     return sql, fixes
 
@@ -81,7 +128,7 @@ def learn_from_error(sql: str, error_message: str) -> None:
     """Learn from SQL errors to improve future corrections."""
     # This would store error patterns in a database or file
     # For now, we'll just log the pattern for analysis
-    if os.getenv("DEBUG", "false").lower() == "true":
+    if _DEBUG:
         print(f"Learning from error: {error_message}")
         print(f"Problematic SQL: {sql}")
 
@@ -98,15 +145,13 @@ def _fix_cast_syntax(sql: str) -> Tuple[str, List[str]]:
     fixes = []
 
     # Pattern: CAST(expression) AS alias -> CAST(expression AS DECIMAL(10,2)) AS alias
-    pattern = SQL_PATTERNS["cast_syntax"]
-
     def replace_cast(match):
         expression = match.group(1)
         alias = match.group(2)
         fixes.append(f"Fixed CAST syntax: {alias}")
         return f"CAST({expression} AS DECIMAL(10,2)) AS {alias}"
 
-    sql = re.sub(pattern, replace_cast, sql)
+    sql = _SQL_REGEXES["cast_syntax"].sub(replace_cast, sql)
     return sql, fixes
 
 
@@ -119,7 +164,7 @@ def _fix_ambiguous_columns(sql: str) -> Tuple[str, List[str]]:
     tables_with_aliases = {}
 
     # Find FROM table
-    from_match = re.search(SQL_PATTERNS["from_table"], sql, re.IGNORECASE)
+    from_match = _SQL_REGEXES["from_table"].search(sql)
     if from_match:
         table_name = from_match.group(1)
         alias = (
@@ -129,7 +174,7 @@ def _fix_ambiguous_columns(sql: str) -> Tuple[str, List[str]]:
         tables_with_aliases[table_name] = alias
 
     # Find JOIN tables
-    join_matches = re.finditer(SQL_PATTERNS["join_table"], sql, re.IGNORECASE)
+    join_matches = _SQL_REGEXES["join_table"].finditer(sql)
     for match in join_matches:
         table_name = match.group(1)
         alias = (
@@ -140,22 +185,16 @@ def _fix_ambiguous_columns(sql: str) -> Tuple[str, List[str]]:
 
     # If we have multiple tables, check for ambiguous columns
     if len(tables_with_aliases) > 1:
-        for column in COMMON_AMBIGUOUS_COLUMNS:
+        for column, bare_column_regex in _BARE_COLUMN_REGEXES.items():
             # Look for bare column references (not table.column)
-            bare_column_pattern = SQL_PATTERNS["bare_column"].format(column=column)
-            if re.search(bare_column_pattern, sql, re.IGNORECASE):
+            if bare_column_regex.search(sql):
                 # Try to determine the correct table based on context
                 # For now, we'll use a simple heuristic: prefer the first table
                 first_table = list(tables_with_aliases.keys())[0]
                 first_alias = tables_with_aliases[first_table]
 
                 # Replace bare column with table.column
-                sql = re.sub(
-                    bare_column_pattern,
-                    f"{first_alias}.{column}",
-                    sql,
-                    flags=re.IGNORECASE,
-                )
+                sql = bare_column_regex.sub(f"{first_alias}.{column}", sql)
                 fixes.append(
                     f"Fixed ambiguous column '{column}' -> '{first_alias}.{column}'"
                 )
@@ -163,7 +202,12 @@ def _fix_ambiguous_columns(sql: str) -> Tuple[str, List[str]]:
     return sql, fixes
 
 
-def _fix_missing_aliases(sql: str) -> Tuple[str, List[str]]:
+def _find_sql_keywords(sql: str) -> Set[str]:
+    """Return the names of the keyword groups that occur in the SQL."""
+    return {match.lastgroup for match in _SQL_KEYWORDS_RE.finditer(sql)}
+
+
+def _fix_missing_aliases(sql: str, keywords: Set[str]) -> Tuple[str, List[str]]:
     """Fix missing table aliases in complex queries."""
 
     fixes = []
@@ -174,47 +218,43 @@ def _fix_missing_aliases(sql: str) -> Tuple[str, List[str]]:
 
     # This is a complex transformation that would require careful parsing
     # For now, we'll just detect the issue
-    if "JOIN" in sql.upper() and not re.search(r"FROM\s+\w+\s+\w+", sql, re.IGNORECASE):
+    if "JOIN" in keywords and not _FROM_WITH_ALIAS_RE.search(sql):
         fixes.append("Detected potential missing table aliases")
 
     return sql, fixes
 
 
-def _fix_join_syntax(sql: str) -> Tuple[str, List[str]]:
+def _fix_join_syntax(sql: str, keywords: Set[str]) -> Tuple[str, List[str]]:
     """Fix JOIN syntax issues."""
 
     fixes = []
 
     # Fix missing ON clauses
-    if "JOIN" in sql.upper() and "ON" not in sql.upper():
+    if "JOIN" in keywords and "ON" not in keywords:
         fixes.append("Detected JOIN without ON clause")
 
     # Fix malformed JOIN conditions
-    if re.search(SQL_PATTERNS["join_on"], sql):
+    if _SQL_REGEXES["join_on"].search(sql):
         fixes.append("Detected JOIN condition syntax")
 
     return sql, fixes
 
 
-def _fix_groupby_syntax(sql: str) -> Tuple[str, List[str]]:
+def _fix_groupby_syntax(sql: str, keywords: Set[str]) -> Tuple[str, List[str]]:
     """Fix GROUP BY syntax issues."""
 
     fixes = []
 
     # Check if SELECT has non-aggregate columns but no GROUP BY
-    if "SELECT" in sql.upper() and "GROUP BY" not in sql.upper():
+    if "SELECT" in keywords and "GROUP_BY" not in keywords:
         # Look for aggregate functions
-        has_aggregates = any(func in sql.upper() for func in AGGREGATE_FUNCTIONS)
-
-        if has_aggregates:
+        if "AGGREGATE" in keywords:
             # Look for non-aggregate columns
-            select_match = re.search(
-                SQL_PATTERNS["select_clause"], sql, re.IGNORECASE | re.DOTALL
-            )
+            select_match = _SQL_REGEXES["select_clause"].search(sql)
             if select_match:
                 select_clause = select_match.group(1)
                 # Simple check for non-aggregate columns
-                if re.search(r"\b\w+\b", select_clause) and not all(
+                if _WORD_RE.search(select_clause) and not all(
                     func in select_clause.upper() for func in AGGREGATE_FUNCTIONS
                 ):
                     fixes.append("Detected potential GROUP BY issue")
@@ -222,116 +262,57 @@ def _fix_groupby_syntax(sql: str) -> Tuple[str, List[str]]:
     return sql, fixes
 
 
-def _fix_invalid_join_references(sql: str) -> Tuple[str, List[str]]:
-    """Fix invalid JOIN references like COUNT(JOIN.id)."""
+def _apply_fused_rewrites(sql: str) -> Tuple[str, List[str]]:
+    """Fix invalid JOIN references and missing columns in one pass."""
 
     fixes = []
 
-    # Fix COUNT(JOIN.id) -> COUNT(orders.id) or appropriate table reference
-    if re.search(SQL_PATTERNS["join_id_reference"], sql, re.IGNORECASE):
-        # Try to determine the correct table reference
-        # Look for table names in FROM and JOIN clauses
-        from_match = re.search(SQL_PATTERNS["from_table"], sql, re.IGNORECASE)
-        if from_match:
-            table_name = from_match.group(1)
-            sql = re.sub(
-                SQL_PATTERNS["join_id_reference"],
-                f"COUNT({table_name}.id)",
-                sql,
-                flags=re.IGNORECASE,
-            )
+    # Resolve the context every rewrite needs before scanning
+    from_match = _SQL_REGEXES["from_table"].search(sql)
+    from_table = from_match.group(1) if from_match else None
+
+    # o.total_amount does not exist: derive it from order_items, adding the
+    # JOIN when the query does not already reference order_items
+    from_orders_match = None
+    if "order_items" in sql or "oi." in sql:
+        total_amount_replacement = f"SUM({_REVENUE_EXPRESSION})"
+    else:
+        from_orders_match = _FROM_ORDERS_RE.search(sql)
+        total_amount_replacement = _REVENUE_EXPRESSION if from_orders_match else "0"
+    needs_order_items_join = False
+
+    def rewrite(match):
+        nonlocal needs_order_items_join
+        kind = match.lastgroup
+        text = match.group(kind)
+
+        # COUNT(JOIN.id) -> COUNT(table.id), falling back to the orders table
+        if kind == "join_id_reference":
+            table_name = from_table or SQL_THRESHOLDS["preferred_fallback_table"]
             fixes.append(f"Fixed COUNT(JOIN.id) -> COUNT({table_name}.id)")
-        else:
-            # Fallback to orders table
-            sql = re.sub(
-                SQL_PATTERNS["join_id_reference"],
-                f"COUNT({SQL_THRESHOLDS['preferred_fallback_table']}.id)",
-                sql,
-                flags=re.IGNORECASE,
-            )
-            fixes.append(
-                f"Fixed COUNT(JOIN.id) -> COUNT({SQL_THRESHOLDS['preferred_fallback_table']}.id)"
-            )
-
-    # Fix other invalid JOIN references
-    if re.search(SQL_PATTERNS["join_reference"], sql, re.IGNORECASE):
-        # Look for the most likely table reference
-        from_match = re.search(SQL_PATTERNS["from_table"], sql, re.IGNORECASE)
-        if from_match:
-            table_name = from_match.group(1)
-            sql = re.sub(
-                SQL_PATTERNS["join_reference"],
-                f"{table_name}.\\1",
-                sql,
-                flags=re.IGNORECASE,
-            )
-            fixes.append(f"Fixed JOIN.column references -> {table_name}.column")
-
-    return sql, fixes
-
-
-def _fix_missing_columns(sql: str) -> Tuple[str, List[str]]:
-    """Fix references to non-existent columns by calculating them properly."""
-
-    fixes = []
-
-    # Fix o.total_amount -> SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))
-    if "o.total_amount" in sql:
-        # Check if order_items is already joined
-        if "order_items" in sql or "oi." in sql:
-            # Replace with proper calculation
-            sql = re.sub(
-                r"o\.total_amount",
-                "SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))",
-                sql,
-                flags=re.IGNORECASE,
-            )
-            fixes.append(
-                "Fixed o.total_amount -> SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))"
-            )
-        else:
-            # Add JOIN to order_items and fix the column reference
-            # Find the FROM clause and add the JOIN
-            from_match = re.search(r"(FROM\s+orders\s+o)", sql, re.IGNORECASE)
-            if from_match:
-                # Add JOIN to order_items
-                join_clause = " JOIN order_items oi ON oi.order_id = o.id"
-                sql = sql.replace(
-                    from_match.group(1), from_match.group(1) + join_clause
-                )
-
-                # Now replace the column reference (remove any existing SUM wrapper)
-                sql = re.sub(
-                    r"SUM\(CAST\(o\.total_amount",
-                    "SUM(CAST(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)",
-                    sql,
-                    flags=re.IGNORECASE,
-                )
-                # Also handle cases without CAST
-                sql = re.sub(
-                    r"o\.total_amount",
-                    "oi.qty * oi.unit_price * (1 - oi.discount_pct/100)",
-                    sql,
-                    flags=re.IGNORECASE,
-                )
-                fixes.append(
-                    "Fixed o.total_amount -> SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100)) with JOIN"
-                )
-            else:
-                # Fallback to 0 if we can't add the JOIN
-                sql = re.sub(r"o\.total_amount", "0", sql, flags=re.IGNORECASE)
-                fixes.append("Fixed o.total_amount -> 0 (could not add JOIN)")
-
-    # Fix other common missing column patterns
-    missing_columns = {
-        r"o\.revenue": "SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))",
-        r"o\.sales": "SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))",
-        r"o\.amount": "SUM(oi.qty * oi.unit_price * (1 - oi.discount_pct/100))",
-    }
-
-    for pattern, replacement in missing_columns.items():
-        if re.search(pattern, sql, re.IGNORECASE):
-            sql = re.sub(pattern, replacement, sql, flags=re.IGNORECASE)
-            fixes.append(f"Fixed {pattern} -> {replacement}")
+            return f"COUNT({table_name}.id)"
+
+        # JOIN.column -> table.column
+        if kind == "join_reference":
+            if from_table is None:
+                return text
+            column = _SQL_REGEXES["join_reference"].match(text).group(1)
+            fixes.append(f"Fixed JOIN.column references -> {from_table}.column")
+            return f"{from_table}.{column}"
+
+        if kind == "total_amount":
+            needs_order_items_join = from_orders_match is not None
+            fixes.append(f"Fixed o.total_amount -> {total_amount_replacement}")
+            return total_amount_replacement
+
+        # o.revenue / o.sales / o.amount
+        fixes.append(f"Fixed {text} -> SUM({_REVENUE_EXPRESSION})")
+        return f"SUM({_REVENUE_EXPRESSION})"
+
+    sql = _FUSED_REWRITE_RE.sub(rewrite, sql)
+
+    if needs_order_items_join:
+        from_clause = from_orders_match.group(1)
+        sql = sql.replace(from_clause, from_clause + _ORDER_ITEMS_JOIN)
 
     return sql, fixes
@@ -5,22 +5,26 @@ This package contains modules for caching, result processing,
 schema indexing, and database tools.
 """
 
-from .cache import get_cache, set_cache
+from .cache import get_cache, normalize_question, set_cache
 from .result_processor import (
     create_result_dictionary,
     generate_chart_from_rows,
     generate_simple_chart_from_rows,
 )
 from .schema_index import (
+    EMBEDDINGS_ARE_SEMANTIC,
+    create_embedding,
     find_similar_questions,
     find_similar_schema,
     get_embedding_stats,
     initialize_schema_embeddings,
     store_question_embedding,
 )
+from .semantic_cache import SemanticCache
 from .tools import (
     export_to_csv,
     get_schema_metadata,
+    invalidate_schema_cache,
     render_chart,
     respond,
     run_sql,
@@ -30,15 +34,20 @@ from .tools import (
 __all__ = [
     "get_cache",
     "set_cache",
+    "normalize_question",
     "generate_chart_from_rows",
     "generate_simple_chart_from_rows",
     "create_result_dictionary",
+    "EMBEDDINGS_ARE_SEMANTIC",
+    "create_embedding",
     "find_similar_questions",
     "find_similar_schema",
     "store_question_embedding",
     "get_embedding_stats",
     "initialize_schema_embeddings",
+    "SemanticCache",
     "get_schema_metadata",
+    "invalidate_schema_cache",
     "respond",
     "run_sql",
     "to_jsonable",
@@ -14,7 +14,9 @@ Key Features:
 - Memory-efficient storage with automatic garbage collection
 """
 
+import re
 import time
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple
 
 # Simple process-local cache for demo purposes.
@@ -23,6 +25,19 @@ _store: Dict[str, Tuple[Any, Optional[float]]] = {}
 _MAX_SIZE = 1000
 _TTL_SECONDS = 15 * 60  # 15 minutes, or None for no TTL
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# The answer, SQL and schema-context caches all key on the same question
+# within one request, so the normalized form is memoized
+@lru_cache(maxsize=1024)
+def normalize_question(question: str) -> str:
+    """Return the form of a question used in cache keys.
+
+    Case, runs of whitespace and trailing punctuation do not change the answer.
+    """
+    return _WHITESPACE_RE.sub(" ", question.strip().casefold()).rstrip("?.! ")
+
 
 def _prune():
     now = time.time()
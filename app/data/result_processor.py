@@ -5,22 +5,42 @@ Handles all result processing logic including chart generation, data processing,
 column detection, and result dictionary creation for the SQL agent system.
 """
 
+import re
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
+from ..config import CHART_THRESHOLDS
 from ..core.query_utils import determine_chart_type
 from ..enums import ChartType, QueryCategory, SQLSource
-from .tools import render_chart, to_jsonable
+from .tools import column_values, render_chart, to_jsonable
+
+_NUMERIC_TYPES = (int, float, Decimal)
+
+# Substrings that mark a numeric column as the preferred y-axis; "price" also
+# covers "unit price" and "unit_price". Each set is matched in one regex scan.
+_PREFERRED_Y_RE = re.compile(
+    "revenue|sales|amount|total|count|sum|avg|quantity|units|price", re.IGNORECASE
+)
+# Narrower preference used by the heuristic fallback chart
+_SIMPLE_Y_RE = re.compile("revenue|sales|amount|total|count|sum|avg", re.IGNORECASE)
+# x columns the heuristic fallback chart draws as a time series
+_TIME_X_COLUMNS = frozenset({"month", "date", "ym", "day", "week", "quarter", "year"})
+
+
+def _first_non_null(rows: List[Dict[str, Any]], col: str) -> Any:
+    """Return the first non-None value of a column, or None if it is all NULL."""
+    return next((row[col] for row in rows if row.get(col) is not None), None)
 
 
 def detect_chart_columns(
-    rows: List[Dict[str, Any]]
+    rows: List[Dict[str, Any]], y_pattern: Pattern[str] = _PREFERRED_Y_RE
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Detect the best x and y columns for chart generation from query results.
 
     Args:
         rows: List of result rows from SQL query
+        y_pattern: Matches column names that make a preferred y column
 
     Returns:
         Tuple of (x_column, y_column) or (None, None) if no suitable columns found
@@ -28,66 +48,37 @@ def detect_chart_columns(
     if not rows or len(rows) == 0:
         return None, None
 
-    cols = list(rows[0].keys())
-    if len(cols) < 2:
+    first_row = rows[0]
+    if len(first_row) < CHART_THRESHOLDS["min_columns"]:
         return None, None
 
-    y_col = None
-    x_col = None
-
-    # Preferred numeric column keywords for y-axis
-    numeric_keywords = [
-        "revenue",
-        "sales",
-        "amount",
-        "total",
-        "count",
-        "sum",
-        "avg",
-        "quantity",
-        "units",
-        "price",
-        "unit price",
-        "unit_price",
-    ]
-
-    # Look for numeric column (y-axis) - prefer revenue/sales/amount columns
-    for col in cols:
-        val = rows[0][col]
-        if isinstance(val, (int, float, Decimal)):
-            # Prefer columns with revenue, sales, amount, total, count, etc.
-            if any(keyword in col.lower() for keyword in numeric_keywords):
-                y_col = col
-                break
-
-    # If no preferred numeric column found, use first numeric column
-    if not y_col:
-        for col in cols:
-            val = rows[0][col]
-            if isinstance(val, (int, float, Decimal)):
-                y_col = col
-                break
-
-    # Look for best text column for x-axis (prefer name over id)
-    for col in cols:
-        if col != y_col:  # Don't use the same column for both axes
-            val = rows[0][col]
-            if isinstance(val, str):
-                # Prefer columns with "name" over "id"
+    # Single pass over the first row: y prefers a keyword-named numeric column
+    # over the first numeric one, x prefers a "name" text column over the
+    # first text one. Numeric and text columns never coincide.
+    preferred_y = first_y = name_x = first_x = None
+    for col, val in first_row.items():
+        # A NULL in the first row says nothing about the column's type
+        if val is None:
+            val = _first_non_null(rows, col)
+        # bool subclasses int, but flag columns make no sense as a y-axis
+        if isinstance(val, _NUMERIC_TYPES) and not isinstance(val, bool):
+            if preferred_y is None:
+                if first_y is None:
+                    first_y = col
+                if y_pattern.search(col):
+                    preferred_y = col
+        elif isinstance(val, str):
+            if name_x is None:
+                if first_x is None:
+                    first_x = col
                 if "name" in col.lower():
-                    x_col = col
-                    break
+                    name_x = col
 
-    # If no "name" column found, use first text column as fallback
-    if not x_col:
-        for col in cols:
-            if col != y_col:  # Don't use the same column for both axes
-                val = rows[0][col]
-                if isinstance(val, str):
-                    x_col = col
-                    break
+        # Nothing later can beat a preferred y and a "name" x
+        if preferred_y is not None and name_x is not None:
+            break
 
-    return x_col, y_col
+    return name_x or first_x, preferred_y or first_y
 
 
 def generate_chart_from_rows(
@@ -111,15 +102,18 @@ def generate_chart_from_rows(
     if not x_col or not y_col:
         return None
 
-    # Extract data for chart type determination
-    x_data = [row[x_col] for row in rows]
-    y_data = [row[y_col] for row in rows]
+    # Extract each charted column once; render_chart reuses them
+    columns = {x_col: column_values(rows, x_col), y_col: column_values(rows, y_col)}
 
     # Use robust chart type selection
-    chart_type = determine_chart_type(x_data, y_data, x_col, y_col, question)
+    chart_type = determine_chart_type(
+        columns[x_col], columns[y_col], x_col, y_col, question
+    )
 
     # Generate chart JSON
-    chart_json = render_chart(rows, spec={"type": chart_type}, x_key=x_col, y_key=y_col)
+    chart_json = render_chart(
+        rows, spec={"type": chart_type}, x_key=x_col, y_key=y_col, columns=columns
+    )
 
     # Convert to JSON-serializable format
     if chart_json is not None:
@@ -144,51 +138,13 @@ def generate_simple_chart_from_rows(
     if not rows or len(rows) == 0:
         return None
 
-    cols = list(rows[0].keys())
-    if len(cols) < 2:
-        return None
-
-    y_col = None
-    x_col = None
-
-    # Simple numeric column detection
-    for col in cols:
-        val = rows[0][col]
-        if isinstance(val, (int, float, Decimal)):
-            if any(
-                keyword in col.lower()
-                for keyword in [
-                    "revenue",
-                    "sales",
-                    "amount",
-                    "total",
-                    "count",
-                    "sum",
-                    "avg",
-                ]
-            ):
-                y_col = col
-                break
-            elif y_col is None:  # Fallback to first numeric column
-                y_col = col
-
-    # Simple text column detection
-    for col in cols:
-        if col != y_col:  # Don't use the same column for both axes
-            val = rows[0][col]
-            if isinstance(val, str):
-                if "name" in col.lower():
-                    x_col = col
-                    break
-                elif x_col is None:  # Fallback to first text column
-                    x_col = col
+    x_col, y_col = detect_chart_columns(rows, _SIMPLE_Y_RE)
 
     if not y_col or not x_col:
         return None
 
     # Simple chart type selection
-    x_name = x_col.lower()
-    chart_type = ChartType.LINE if x_name in ("month", "date", "ym") else ChartType.BAR
+    chart_type = ChartType.LINE if x_col.lower() in _TIME_X_COLUMNS else ChartType.BAR
 
     chart_json = render_chart(
         rows, spec={"type": chart_type.value}, x_key=x_col, y_key=y_col
@@ -236,6 +192,7 @@ def create_result_dictionary(
     error_details: Optional[Dict[str, Any]] = None,
     query_suggestions: List[str] = None,
     related_questions: List[str] = None,
+    generate_chart: bool = True,
 ) -> Dict[str, Any]:
     """
     Create a complete result dictionary with all necessary fields.
@@ -257,12 +214,14 @@ def create_result_dictionary(
         error_details: Error details (optional)
         query_suggestions: Query suggestions (optional)
         related_questions: Related questions (optional)
+        generate_chart: Generate a chart when chart_json is None; pass False
+            when the caller already tried and no chart could be drawn
 
     Returns:
         Complete result dictionary with learning metrics included
     """
     # Generate chart if not provided
-    if chart_json is None and rows:
+    if chart_json is None and rows and generate_chart:
         chart_json = generate_chart_from_rows(rows, question)
 
     # Determine answer text
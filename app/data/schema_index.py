@@ -15,7 +15,8 @@ Key Features:
 
 import hashlib
 import os
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import chromadb
 from chromadb.config import Settings
@@ -25,6 +26,14 @@ _chroma_client = None
 _schema_collection = None
 _questions_collection = None
 
+# HNSW index parameters applied when a collection is created. Existing
+# collections keep the settings they were created with.
+_HNSW_METADATA = {
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
 
 def _get_chroma_client():
     """Get or create ChromaDB client."""
@@ -52,7 +61,10 @@ def _get_schema_collection():
         except (ValueError, Exception):
             _schema_collection = client.create_collection(
                 name="schema_embeddings",
-                metadata={"description": "Database schema embeddings"},
+                metadata={
+                    "description": "Database schema embeddings",
+                    **_HNSW_METADATA,
+                },
             )
     return _schema_collection
 
@@ -67,16 +79,33 @@ def _get_questions_collection():
         except (ValueError, Exception):
             _questions_collection = client.create_collection(
                 name="question_embeddings",
-                metadata={"description": "Question and SQL pattern embeddings"},
+                metadata={
+                    "description": "Question and SQL pattern embeddings",
+                    **_HNSW_METADATA,
+                },
             )
     return _questions_collection
 
 
+# Hash embeddings only match identical text, so similarity lookups are
+# meaningless; set this once create_embedding uses a real embedding model.
+# Until then the answer and schema-context caches only serve exact matches.
+EMBEDDINGS_ARE_SEMANTIC = False
+
+
 def create_embedding(text: str) -> List[float]:
     """
     Create embedding for text using a simple hash-based approach.
     This is a placeholder - in production you would use OpenAI embeddings.
     """
+    # The same question is embedded for schema lookup, similar-question lookup
+    # and storage, so repeat texts are served from a small memo
+    return list(_embed_text(text))
+
+
+@lru_cache(maxsize=256)
+def _embed_text(text: str) -> Tuple[float, ...]:
+    """Compute the embedding for text; memoized by create_embedding."""
     # Simple hash-based embedding for now (hashlib)
     # In production, replace this with OpenAI embeddings
 
@@ -92,7 +121,7 @@ def create_embedding(text: str) -> List[float]:
     while len(embedding) < 384:
         embedding.extend(embedding[: min(len(embedding), 384 - len(embedding))])
 
-    return embedding[:384]
+    return tuple(embedding[:384])
 
 
 def store_schema_embedding(table_name: str, column_info: List[Dict[str, Any]]):
@@ -124,11 +153,18 @@ def store_schema_embedding(table_name: str, column_info: List[Dict[str, Any]]):
 
 
 def store_question_embedding(
-    question: str, sql: str, metadata: Optional[Dict[str, Any]] = None
+    question: str,
+    sql: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    embedding: Optional[List[float]] = None,
 ):
-    """Store question and its SQL as embedding."""
+    """Store question and its SQL as embedding.
+
+    Pass ``embedding`` when the question has already been embedded.
+    """
     # Create embedding for the question
-    embedding = create_embedding(question)
+    if embedding is None:
+        embedding = create_embedding(question)
 
     # Store in ChromaDB
     collection = _get_questions_collection()
@@ -147,12 +183,17 @@ def store_question_embedding(
     )
 
 
-def find_similar_schema(query: str, n_results: int = 3) -> List[Dict[str, Any]]:
-    """Find schema information similar to the query."""
+def find_similar_schema(
+    query: str, n_results: int = 3, embedding: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
+    """Find schema information similar to the query.
+
+    Pass ``embedding`` to reuse a vector already computed for the query.
+    """
     collection = _get_schema_collection()
 
     # Create embedding for the query
-    query_embedding = create_embedding(query)
+    query_embedding = embedding if embedding is not None else create_embedding(query)
 
     # Search for similar schema
     results = collection.query(
@@ -175,12 +216,17 @@ def find_similar_schema(query: str, n_results: int = 3) -> List[Dict[str, Any]]:
     ]
 
 
-def find_similar_questions(query: str, n_results: int = 3) -> List[Dict[str, Any]]:
-    """Find questions similar to the query."""
+def find_similar_questions(
+    query: str, n_results: int = 3, embedding: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
+    """Find questions similar to the query.
+
+    Pass ``embedding`` to reuse a vector already computed for the query.
+    """
     collection = _get_questions_collection()
 
     # Create embedding for the query
-    query_embedding = create_embedding(query)
+    query_embedding = embedding if embedding is not None else create_embedding(query)
 
     # Search for similar questions
     results = collection.query(
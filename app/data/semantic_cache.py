@@ -0,0 +1,117 @@
+"""
+Semantic Caching System
+
+In-memory cache that matches entries either by exact normalized key or by
+embedding similarity. Used to skip repeated retrieval work for questions that
+were already answered verbatim or phrased almost identically.
+
+Key Features:
+- Exact-match fast path keyed on the normalized question
+- Cosine-similarity lookup over stored embeddings with a configurable threshold
+- LRU eviction with a bounded entry count
+- TTL-based expiration so cached context does not go stale
+- Lock-protected operations for concurrent request handlers
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """LRU cache with exact-key and embedding-similarity lookups."""
+
+    def __init__(
+        self,
+        similarity_threshold: float,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (unit embedding, value, expires_at or None), oldest first
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Stacked embeddings for similarity search, rebuilt lazily after writes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under an exact key, if present and fresh."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if self._is_expired(item):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def get_similar(self, embedding: List[float]) -> Optional[Any]:
+        """Return the value of the most similar entry above the threshold."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries.keys())
+                self._matrix = np.stack(
+                    [self._entries[k][0] for k in self._matrix_keys]
+                )
+
+            similarities = self._matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+
+            key = self._matrix_keys[best]
+            item = self._entries[key]
+            if self._is_expired(item):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, embedding: List[float], value: Any) -> None:
+        """Store a value under its exact key and embedding."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (vector, value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def _is_expired(self, item: Tuple[np.ndarray, Any, Optional[float]]) -> bool:
+        expires_at = item[2]
+        return expires_at is not None and expires_at < time.time()
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._matrix = None
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
@@ -19,10 +19,13 @@ Key Features:
 import csv
 import io
 import os
+import time
 from decimal import Decimal
-from typing import Any, Dict, List, Mapping, Optional
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import numpy as np
+import orjson
 import plotly.graph_objects as go
 from dotenv import load_dotenv
 from fastapi.encoders import jsonable_encoder
@@ -38,6 +41,12 @@ DATABASE_URL = os.getenv(
 
 _engine: Optional[Engine] = None
 
+# Schema introspection is a round-trip per table, so reuse it for a while.
+# Held here as (metadata, expires_at) rather than in the shared result
+# cache, where answer entries could evict it and clear_cache would drop it.
+_schema_cache: Optional[Tuple[Dict[str, Any], float]] = None
+_SCHEMA_CACHE_TTL_SECONDS = 5 * 60  # 5 minutes
+
 
 def _engine_once() -> Engine:
     global _engine
@@ -68,8 +77,21 @@ def describe_schema() -> Dict[str, Any]:
         return out
 
 
-def get_schema_metadata() -> Dict[str, Any]:
-    return {"database_url": DATABASE_URL, "schema": describe_schema()}
+def get_schema_metadata(refresh: bool = False) -> Dict[str, Any]:
+    """Return schema metadata, re-reading it from the database every few minutes."""
+    global _schema_cache
+    cached = _schema_cache
+    if not refresh and cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    metadata = {"database_url": DATABASE_URL, "schema": describe_schema()}
+    _schema_cache = (metadata, time.monotonic() + _SCHEMA_CACHE_TTL_SECONDS)
+    return metadata
+
+
+def invalidate_schema_cache() -> None:
+    """Drop the cached schema metadata, e.g. after DDL, so the next read reloads it."""
+    global _schema_cache
+    _schema_cache = None
 
 
 def run_sql(sql: str) -> List[Dict[str, Any]]:
@@ -79,16 +101,23 @@ def run_sql(sql: str) -> List[Dict[str, Any]]:
     eng = _engine_once()
     with eng.connect() as conn:
         res = conn.execute(text(sql))
-        cols = res.keys()
+        # A plain tuple is cheaper to zip per row than the result's key view
+        cols = tuple(res.keys())
         rows = [dict(zip(cols, row)) for row in res.fetchall()]
         return rows
 
 
+def column_values(rows: List[Dict[str, Any]], key: str) -> List[Any]:
+    """Return one column of the result rows as a list."""
+    return list(map(itemgetter(key), rows))
+
+
 def render_chart(
     rows: List[Dict[str, Any]],
     spec: Optional[Dict[str, Any]] = None,
     x_key: Optional[str] = None,
     y_key: Optional[str] = None,
+    columns: Optional[Dict[str, List[Any]]] = None,
 ) -> Dict[str, Any]:
     spec = spec or {"type": ChartType.BAR.value}
     if not rows or len(rows) == 0:
@@ -105,9 +134,14 @@ def render_chart(
         if y_key is None:
             return {}
 
-    # Extract data for plotting
-    x_data = [row[x_key] for row in rows]
-    y_data = [row[y_key] for row in rows]
+    # Extract data for plotting, reusing columns the caller already pulled out
+    columns = columns or {}
+    x_data = columns.get(x_key)
+    if x_data is None:
+        x_data = column_values(rows, x_key)
+    y_data = columns.get(y_key)
+    if y_data is None:
+        y_data = column_values(rows, y_key)
 
     # Create figure using lower-level Plotly API
     fig = go.Figure()
@@ -143,7 +177,14 @@ def render_chart(
     return fig.to_dict()
 
 
+# Leaf types that are already JSON-safe; checked by exact type first because
+# they make up nearly every value in rows and chart dicts
+_JSON_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
 def to_jsonable(x):
+    if type(x) in _JSON_SCALAR_TYPES:
+        return x
     if isinstance(x, np.ndarray):
         return x.tolist()
     if isinstance(x, (np.generic,)):
@@ -158,7 +199,18 @@ def to_jsonable(x):
 
 
 def respond(payload):
-    return jsonable_encoder(payload)  # use for all returns
+    # use for all returns. orjson encodes the common types natively and hands
+    # the rest (Decimal, timedelta, models, ...) to jsonable_encoder, so the
+    # result matches jsonable_encoder at a fraction of the cost on large rows
+    try:
+        return orjson.loads(
+            orjson.dumps(
+                payload, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+            )
+        )
+    except orjson.JSONEncodeError:
+        # e.g. integers wider than 64 bits
+        return jsonable_encoder(payload)
 
 
 def export_to_csv(
@@ -17,6 +17,10 @@ Key Features:
 - Adaptive learning with continuous improvement algorithms
 """
 
+import itertools
+import logging
+import queue
+import threading
 from typing import Any, Dict, List, Tuple
 
 from ..config import (
@@ -28,6 +32,8 @@ from ..config import (
 from ..data.cache import delete_cache, get_cache, set_cache
 from ..enums import ErrorType, QueryCategory, SQLSource
 
+logger = logging.getLogger(__name__)
+
 
 class QueryCategorizer:
     """Categorizes queries into different types for better pattern recognition."""
@@ -293,8 +299,9 @@ class QueryExpander:
             suggestions.extend(GENERAL_SUGGESTIONS[: n_suggestions - len(suggestions)])
 
         # Filter out the current question to avoid redundancy
+        question_normalized = question.lower().strip()
         filtered_suggestions = [
-            s for s in suggestions if s.lower().strip() != question.lower().strip()
+            s for s in suggestions if s.lower().strip() != question_normalized
         ]
 
         return filtered_suggestions[:n_suggestions]
@@ -324,6 +331,65 @@ _expander = QueryExpander()
 # Load existing metrics
 _metrics.load_metrics()
 
+# Metrics are recorded by a background thread so the bookkeeping stays off
+# the request path; records are dropped rather than blocking when it falls
+# this far behind
+_METRICS_QUEUE_SIZE = 1000
+_metrics_queue = queue.Queue(maxsize=_METRICS_QUEUE_SIZE)
+# Dropped records are logged on the first drop and every Nth after it
+_METRICS_DROP_LOG_EVERY = 100
+_dropped_metrics = itertools.count(1)
+# Longest a metrics read or clear waits for the queued records to land
+_METRICS_FLUSH_TIMEOUT_SECONDS = 2.0
+
+
+def _metrics_worker():
+    """Apply queued metric records one at a time."""
+    while True:
+        record, args = _metrics_queue.get()
+        try:
+            if record is None:
+                # Flush marker: every record queued before it has been applied
+                args[0].set()
+            else:
+                record(*args)
+                _metrics.save_metrics()
+        except Exception as e:
+            logger.warning("Failed to record metrics: %s", e)
+        finally:
+            _metrics_queue.task_done()
+
+
+threading.Thread(target=_metrics_worker, name="metrics-recorder", daemon=True).start()
+
+
+def _enqueue_metrics(record, *args):
+    """Queue a metrics update for the background worker."""
+    try:
+        _metrics_queue.put_nowait((record, args))
+    except queue.Full:
+        dropped = next(_dropped_metrics)
+        if dropped % _METRICS_DROP_LOG_EVERY == 1:
+            logger.warning("Metrics queue full; dropped %d record(s) so far", dropped)
+
+
+def _flush_metrics_queue() -> bool:
+    """Wait, for a bounded time, until the records queued so far are applied.
+
+    Returns:
+        True if they were applied, False if the wait gave up
+    """
+    flushed = threading.Event()
+    try:
+        _metrics_queue.put_nowait((None, (flushed,)))
+    except queue.Full:
+        # Already dropping records; report what has landed so far
+        return False
+    if not flushed.wait(_METRICS_FLUSH_TIMEOUT_SECONDS):
+        logger.warning("Timed out waiting for queued metrics to be recorded")
+        return False
+    return True
+
 
 def categorize_query(question: str) -> Tuple[str, float, Dict[str, Any]]:
     """Categorize a query using the global categorizer."""
@@ -336,24 +402,28 @@ def record_query_metrics(
     response_time: float,
     is_ai_attempt: bool = False,
 ):
-    """Record query metrics using the global metrics tracker."""
-    _metrics.record_query(question, result, response_time, is_ai_attempt)
-    _metrics.save_metrics()
+    """Record query metrics using the global metrics tracker (in the background)."""
+    _enqueue_metrics(
+        _metrics.record_query, question, result, response_time, is_ai_attempt
+    )
 
 
 def record_error_metrics(error_type: str, error_message: str):
-    """Record error metrics using the global metrics tracker."""
-    _metrics.record_error(error_type, error_message)
-    _metrics.save_metrics()
+    """Record error metrics using the global metrics tracker (in the background)."""
+    _enqueue_metrics(_metrics.record_error, error_type, error_message)
 
 
 def clear_learning_metrics():
     """Clear all learning metrics (useful for testing)."""
+    # Let queued records land first so none are applied after the clear
+    _flush_metrics_queue()
     _metrics.clear_metrics()
 
 
 def get_learning_metrics() -> Dict[str, Any]:
     """Get current learning metrics."""
+    # Wait for queued records so callers see every finished query
+    _flush_metrics_queue()
     return _metrics.get_metrics()
 
 
@@ -17,13 +17,18 @@ Key Features:
 - Comprehensive error handling and validation
 """
 
+import logging
+import logging.handlers
 import os
+import queue
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import HTMLResponse, JSONResponse, Response
 
 from .agent import answer_question
+from .core import warm_up_llm
 from .data import (
     export_to_csv,
     get_embedding_stats,
@@ -46,7 +51,72 @@ from .utils import clear_error_logs, get_error_logs, get_error_summary, get_log_
 # Global debug flag - can be set via environment variable or command line
 DEBUG_MODE = os.getenv("DEBUG", "false").lower() == "true"
 
-app = FastAPI(title="NL-SQL Agent", version="0.1.0")
+# Level for the app's loggers: DEBUG with debug output on, else LOG_LEVEL.
+# Without either, a level set by logging config is kept, defaulting to INFO
+# so recovery steps are visible.
+_app_logger = logging.getLogger(__package__)
+_log_level = "DEBUG" if DEBUG_MODE else os.getenv("LOG_LEVEL")
+if _log_level:
+    _app_logger.setLevel(_log_level.upper())
+elif _app_logger.level == logging.NOTSET:
+    _app_logger.setLevel(logging.INFO)
+
+
+class _RootForwardHandler(logging.Handler):
+    """Pass records to the root logger's handlers, as propagation would."""
+
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # While serving, the app's records are handed to a listener thread, so
+    # request threads only enqueue them; the listener passes them on to the
+    # root logger's handlers (stderr when none are configured). The root and
+    # uvicorn loggers keep their own handlers.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    log_listener = logging.handlers.QueueListener(
+        log_queue,
+        (
+            _RootForwardHandler()
+            if logging.getLogger().handlers
+            else logging.StreamHandler()
+        ),
+        respect_handler_level=True,
+    )
+    propagate = _app_logger.propagate
+    _app_logger.addHandler(queue_handler)
+    _app_logger.propagate = False
+    log_listener.start()
+    try:
+        # Opt-in: importing LangChain and building the client moves the
+        # first-request cold start to server startup
+        if os.getenv("WARM_UP_LLM", "false").lower() == "true":
+            warm_up_llm()
+        yield
+    finally:
+        log_listener.stop()
+        _app_logger.removeHandler(queue_handler)
+        _app_logger.propagate = propagate
+
+
+app = FastAPI(title="NL-SQL Agent", version="0.1.0", lifespan=_lifespan)
+
+
+def _validate_question(question) -> None:
+    """Raise a 400 for a missing, non-string or blank question."""
+    # Valid questions take a single check; the detail is only built on failure
+    if isinstance(question, str) and question.strip():
+        return
+    if not question:
+        detail = "Question cannot be empty or None"
+    elif not isinstance(question, str):
+        detail = f"Question must be a string, got {type(question).__name__}"
+    else:
+        detail = "Question cannot be empty or whitespace only"
+    raise HTTPException(status_code=400, detail=detail)
 
 
 @app.get("/health")
@@ -135,7 +205,7 @@ def learning_dashboard():
 def initialize_embeddings():
     """Initialize schema embeddings."""
     try:
-        schema_info = get_schema_metadata()
+        schema_info = get_schema_metadata(refresh=True)
         initialize_schema_embeddings(schema_info)
         return {
             "status": "success",
@@ -152,20 +222,7 @@ def ask(
 ):
     try:
         # Validate question before processing
-        # Enhanced validation
-        if not req.question:
-            raise HTTPException(
-                status_code=400, detail="Question cannot be empty or None"
-            )
-        if not isinstance(req.question, str):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Question must be a string, got {type(req.question).__name__}",
-            )
-        if not req.question.strip():
-            raise HTTPException(
-                status_code=400, detail="Question cannot be empty or whitespace only"
-            )
+        _validate_question(req.question)
 
         result = answer_question(req.question, force_heuristic=req.force_heuristic)
 
@@ -205,15 +262,7 @@ def ask_html(question: str, force_heuristic: bool = Query(False)):
     """Simple GET endpoint for testing HTML responses in browser."""
     try:
         # Validate question before processing
-        # Enhanced validation
-        if not question:
-            raise HTTPException(
-                status_code=400, detail="Question cannot be empty or None"
-            )
-        if not question.strip():
-            raise HTTPException(
-                status_code=400, detail="Question cannot be empty or whitespace only"
-            )
+        _validate_question(question)
 
         result = answer_question(question, force_heuristic=force_heuristic)
 
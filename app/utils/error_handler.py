@@ -19,9 +19,12 @@ def create_error_result(
     start_time: float = None,
     additional_details: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Create a standardized error result dictionary."""
+    """Create a standardized error result dictionary.
+
+    start_time is a time.perf_counter() reading.
+    """
     if start_time is None:
-        start_time = time.time()
+        start_time = time.perf_counter()
 
     error_details = {
         "type": error_type,
@@ -44,7 +47,7 @@ def create_error_result(
         "error_details": error_details,
         "query_category": QueryCategory.UNKNOWN.value,
         "category_confidence": 0.0,
-        "response_time": time.time() - start_time,
+        "response_time": time.perf_counter() - start_time,
     }
 
     # Record metrics for the error
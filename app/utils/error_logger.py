@@ -24,6 +24,9 @@ from typing import Any, Dict, Optional
 
 from ..enums import ErrorType
 
+# Resolved once at import; restart the server to toggle debug output
+_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
 
 def _rotate_logs_if_needed(log_file: str, max_size_mb: int = 10):
     """Rotate log files if they exceed the maximum size."""
@@ -118,7 +121,7 @@ def log_ai_error(
             f.write(f"{'='*80}\n")
 
         # Print to console if DEBUG mode
-        if os.getenv("DEBUG", "false").lower() == "true":
+        if _DEBUG:
             print(f"AI Error logged: {error_type} - {error_message}")
 
     except Exception as e:
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.data import semantic_cache
+from app.data.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's clock with one the test advances by hand."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(semantic_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_exact_get_returns_stored_value():
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=10)
+    cache.set("a", [1.0, 0.0], "value-a")
+
+    assert cache.get("a") == "value-a"
+    assert cache.get("missing") is None
+
+
+def test_similar_lookup_respects_threshold():
+    cache = SemanticCache(similarity_threshold=0.95, max_entries=10)
+    cache.set("a", [1.0, 0.0], "value-a")
+
+    # cos = 0.995 and 0.707 against [1, 0]
+    assert cache.get_similar([1.0, 0.1]) == "value-a"
+    assert cache.get_similar([1.0, 1.0]) is None
+
+
+def test_similar_lookup_picks_the_closest_entry():
+    cache = SemanticCache(similarity_threshold=0.5, max_entries=10)
+    cache.set("a", [1.0, 0.0], "value-a")
+    cache.set("b", [0.0, 1.0], "value-b")
+
+    assert cache.get_similar([0.2, 1.0]) == "value-b"
+    assert cache.get_similar([1.0, 0.2]) == "value-a"
+
+
+def test_similarity_ignores_vector_length():
+    cache = SemanticCache(similarity_threshold=0.99, max_entries=10)
+    cache.set("a", [3.0, 4.0], "value-a")
+
+    assert cache.get_similar([0.3, 0.4]) == "value-a"
+
+
+def test_zero_embeddings_are_neither_stored_nor_matched():
+    cache = SemanticCache(similarity_threshold=0.5, max_entries=10)
+    cache.set("zero", [0.0, 0.0], "value-zero")
+    cache.set("a", [1.0, 0.0], "value-a")
+
+    assert cache.get("zero") is None
+    assert cache.get_similar([0.0, 0.0]) is None
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=2)
+    cache.set("a", [1.0, 0.0], "value-a")
+    cache.set("b", [0.0, 1.0], "value-b")
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "value-a"
+    cache.set("c", [1.0, 1.0], "value-c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "value-a"
+    assert cache.get("c") == "value-c"
+
+
+def test_similar_hit_refreshes_lru_position():
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=2)
+    cache.set("a", [1.0, 0.0], "value-a")
+    cache.set("b", [0.0, 1.0], "value-b")
+
+    assert cache.get_similar([1.0, 0.05]) == "value-a"
+    cache.set("c", [1.0, 1.0], "value-c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "value-a"
+
+
+def test_overwriting_a_key_replaces_its_embedding():
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=10)
+    cache.set("a", [1.0, 0.0], "old")
+    cache.set("a", [0.0, 1.0], "new")
+
+    assert cache.get("a") == "new"
+    assert cache.get_similar([1.0, 0.0]) is None
+    assert cache.get_similar([0.0, 1.0]) == "new"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=10, ttl_seconds=60)
+    cache.set("a", [1.0, 0.0], "value-a")
+
+    clock.value += 59
+    assert cache.get("a") == "value-a"
+    assert cache.get_similar([1.0, 0.0]) == "value-a"
+
+    clock.value += 2
+    assert cache.get_similar([1.0, 0.0]) is None
+    assert cache.get("a") is None
+
+
+def test_entries_without_ttl_never_expire(clock):
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=10)
+    cache.set("a", [1.0, 0.0], "value-a")
+
+    clock.value += 10**9
+    assert cache.get("a") == "value-a"
+
+
+def test_clear_removes_all_entries():
+    cache = SemanticCache(similarity_threshold=0.9, max_entries=10)
+    cache.set("a", [1.0, 0.0], "value-a")
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.get_similar([1.0, 0.0]) is None
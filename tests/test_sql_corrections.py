@@ -0,0 +1,147 @@
+import re
+
+import pytest
+
+from app.config import SQL_PATTERNS, SQL_THRESHOLDS
+from app.core.sql_corrections import (
+    _apply_fused_rewrites,
+    _fix_cast_syntax,
+    fix_sql_syntax,
+)
+
+_REVENUE = "oi.qty * oi.unit_price * (1 - oi.discount_pct/100)"
+
+
+def _old_rewrites(sql):
+    """The CAST, JOIN-reference and missing-column rules applied one by one.
+
+    The CAST pass followed by the fused scan replaced these sequential
+    passes; upper-case SQL must come out the same.
+    """
+    sql = re.sub(
+        SQL_PATTERNS["cast_syntax"],
+        lambda m: f"CAST({m.group(1)} AS DECIMAL(10,2)) AS {m.group(2)}",
+        sql,
+    )
+
+    from_match = re.search(SQL_PATTERNS["from_table"], sql, re.IGNORECASE)
+    if re.search(SQL_PATTERNS["join_id_reference"], sql, re.IGNORECASE):
+        table_name = (
+            from_match.group(1)
+            if from_match
+            else SQL_THRESHOLDS["preferred_fallback_table"]
+        )
+        sql = re.sub(
+            SQL_PATTERNS["join_id_reference"],
+            f"COUNT({table_name}.id)",
+            sql,
+            flags=re.IGNORECASE,
+        )
+    if from_match and re.search(SQL_PATTERNS["join_reference"], sql, re.IGNORECASE):
+        sql = re.sub(
+            SQL_PATTERNS["join_reference"],
+            f"{from_match.group(1)}.\\1",
+            sql,
+            flags=re.IGNORECASE,
+        )
+
+    if "o.total_amount" in sql:
+        if "order_items" in sql or "oi." in sql:
+            replacement = f"SUM({_REVENUE})"
+        else:
+            orders_match = re.search(r"(FROM\s+orders\s+o)", sql, re.IGNORECASE)
+            if orders_match:
+                from_clause = orders_match.group(1)
+                sql = sql.replace(
+                    from_clause,
+                    from_clause + " JOIN order_items oi ON oi.order_id = o.id",
+                )
+                replacement = _REVENUE
+            else:
+                replacement = "0"
+        sql = re.sub(r"o\.total_amount", replacement, sql, flags=re.IGNORECASE)
+
+    for pattern in (r"o\.revenue", r"o\.sales", r"o\.amount"):
+        sql = re.sub(pattern, f"SUM({_REVENUE})", sql, flags=re.IGNORECASE)
+
+    return sql
+
+
+_CORPUS = [
+    "SELECT id, name FROM customers c ORDER BY name",
+    "SELECT CAST(SUM(oi.qty) / COUNT(*)) AS avg_qty FROM order_items oi",
+    "SELECT CAST(AVG(p.price)) AS avg_price ORDER BY avg_price",
+    "SELECT CAST(JOIN.amount) AS amt FROM orders o",
+    "SELECT COUNT(JOIN.id) FROM orders o JOIN customers c ON c.id = o.customer_id",
+    "SELECT COUNT(JOIN.id) AS n",
+    "SELECT JOIN.name, COUNT(*) FROM customers c GROUP BY JOIN.name",
+    "SELECT JOIN.name",
+    "SELECT o.id, o.total_amount FROM orders o WHERE o.total_amount > 100",
+    "SELECT SUM(CAST(o.total_amount AS DECIMAL(10,2))) FROM orders o",
+    "SELECT o.total_amount FROM orders o JOIN order_items oi ON oi.order_id = o.id",
+    "SELECT o.total_amount FROM orders",
+    "SELECT c.name, o.revenue, o.sales FROM orders o JOIN customers c",
+    "SELECT o.amount FROM orders o GROUP BY o.customer_id",
+    "SELECT CAST(o.total_amount) AS total FROM orders o",
+    "SELECT CAST(o.revenue) AS rev FROM orders o GROUP BY o.id",
+]
+
+
+@pytest.mark.parametrize("sql", _CORPUS)
+def test_fused_rewrites_match_old_rules(sql):
+    cast_fixed, cast_fixes = _fix_cast_syntax(sql)
+    fixed, fixes = _apply_fused_rewrites(cast_fixed)
+
+    assert fixed == _old_rewrites(sql)
+    assert bool(cast_fixes + fixes) == (fixed != sql)
+
+
+def test_lowercase_cast_is_fixed_like_uppercase():
+    fixed, fixes = _fix_cast_syntax("select cast(p.price) as price from products p")
+
+    assert fixed == "select CAST(p.price AS DECIMAL(10,2)) AS price from products p"
+    assert fixes == ["Fixed CAST syntax: price"]
+
+
+def test_uppercase_total_amount_is_rewritten():
+    fixed, _ = _apply_fused_rewrites("SELECT O.TOTAL_AMOUNT FROM orders o")
+
+    assert fixed == (
+        f"SELECT {_REVENUE} FROM orders o JOIN order_items oi ON oi.order_id = o.id"
+    )
+
+
+def test_lowercase_join_reference_is_rewritten():
+    fixed, _ = _apply_fused_rewrites("select join.name from customers c")
+
+    assert fixed == "select customers.name from customers c"
+
+
+def test_cast_is_fixed_before_ambiguous_columns_are_qualified():
+    sql = (
+        "SELECT CAST(o.price) AS name FROM orders o "
+        "JOIN customers c ON c.id=o.customer_id"
+    )
+
+    fixed, fixes_applied = fix_sql_syntax(sql)
+
+    assert fixes_applied
+    assert fixed == (
+        "SELECT CAST(o.price AS DECIMAL(10,2)) AS o.name FROM orders o "
+        "JOIN customers c ON c.id=o.customer_id"
+    )
+
+
+def test_lowercase_join_on_is_detected_like_uppercase():
+    upper = "SELECT o.id FROM orders o JOIN customers ON customers.id = o.customer_id"
+    lower = "select o.id from orders o join customers on customers.id = o.customer_id"
+
+    assert fix_sql_syntax(upper)[1] is True
+    assert fix_sql_syntax(lower)[1] is True
+
+
+def test_clean_query_is_left_alone():
+    sql = "SELECT c.name, COUNT(*) AS n FROM customers c GROUP BY c.name"
+
+    assert _fix_cast_syntax(sql) == (sql, [])
+    assert _apply_fused_rewrites(sql) == (sql, [])
@@ -0,0 +1,113 @@
+import pytest
+
+from app.core.ai_handler import _parse_sql_response, _StatementBuffer
+
+
+def _feed(chunks):
+    """Feed chunks until the buffer asks to stop; return (text, stopped)."""
+    buffer = _StatementBuffer()
+    for chunk in chunks:
+        if buffer.feed(chunk):
+            return buffer.text, True
+    return buffer.text, False
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        (["SELECT 1;\n```\nThis query returns one."], "SELECT 1;"),
+        (["SELECT ", "id FROM t", "; trailing"], "SELECT id FROM t;"),
+        (["SELECT 'a;b' FROM t; x"], "SELECT 'a;b' FROM t;"),
+        (['SELECT "a;b" FROM t; x'], 'SELECT "a;b" FROM t;'),
+        (["SELECT `a;b` FROM t; x"], "SELECT `a;b` FROM t;"),
+        (["SELECT 'it''s;' FROM t; x"], "SELECT 'it''s;' FROM t;"),
+        (["SELECT (SELECT 1; 2) x; y"], "SELECT (SELECT 1; 2) x;"),
+    ],
+)
+def test_stops_after_first_statement(chunks, expected):
+    assert _feed(chunks) == (expected, True)
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        # Backslash-escaped quotes stay inside the literal
+        (["SELECT 'O\\'Brien; x' FROM t; y"], "SELECT 'O\\'Brien; x' FROM t;"),
+        (["SELECT 'a\\", "'; b' FROM t; y"], "SELECT 'a\\'; b' FROM t;"),
+        (["SELECT '\\\\'; y"], "SELECT '\\\\';"),
+        # Apostrophes and semicolons inside comments are ignored
+        (["SELECT 1 -- it's; fine\nFROM t; y"], "SELECT 1 -- it's; fine\nFROM t;"),
+        (["SELECT 1 # it's;\nFROM t; y"], "SELECT 1 # it's;\nFROM t;"),
+        (["SELECT 1 /* it's; */ FROM t; y"], "SELECT 1 /* it's; */ FROM t;"),
+        (["SELECT 1 /*/ ; */ FROM t; y"], "SELECT 1 /*/ ; */ FROM t;"),
+        # Comment markers split across chunks
+        (["SELECT 1 -", "- x;\nFROM t; y"], "SELECT 1 -- x;\nFROM t;"),
+        (["SELECT 1 /", "* ; *", "/ FROM t; y"], "SELECT 1 /* ; */ FROM t;"),
+    ],
+)
+def test_escapes_and_comments_do_not_end_statement(chunks, expected):
+    assert _feed(chunks) == (expected, True)
+
+
+def test_unterminated_statement_reads_whole_stream():
+    assert _feed(["SELECT id ", "FROM t"]) == ("SELECT id FROM t", False)
+
+
+def test_unbalanced_parenthesis_keeps_reading():
+    assert _feed(["SELECT (1; 2"]) == ("SELECT (1; 2", False)
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ["DELETE FROM t WHERE id = 1"],
+        ["```sql\nDROP TABLE t"],
+        ["Here is ", "the query you asked for"],
+    ],
+)
+def test_stops_early_when_text_cannot_be_select(chunks):
+    text, stopped = _feed(chunks)
+    assert stopped
+    assert not text.endswith(";")
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ["```sql\nSELECT 1"],
+        ["```", "sql\n", "sel", "ect 1"],
+        ["  \n", "SELECT 1"],
+    ],
+)
+def test_fenced_or_split_select_is_not_rejected(chunks):
+    assert _feed(chunks) == ("".join(chunks), False)
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        # Fenced reply with commentary after the fence
+        (
+            ["```sql\nSELECT name FROM t;\n```\nThis query lists names; enjoy it."],
+            "```sql\nSELECT name FROM t;",
+        ),
+        (
+            ["```sql\nSELECT name FROM t\n```\nThis query lists names; enjoy it."],
+            "```sql\nSELECT name FROM t\n```",
+        ),
+        # Fenced reply without commentary, fences split across chunks
+        (["`", "``sql\nSELECT 1\n`", "``"], "```sql\nSELECT 1\n```"),
+        (["```\nSELECT `a;b` FROM t\n```"], "```\nSELECT `a;b` FROM t\n```"),
+    ],
+)
+def test_markdown_fences_are_not_identifier_quotes(chunks, expected):
+    text, stopped = _feed(chunks)
+
+    assert (text, stopped) == (expected, True)
+    assert _parse_sql_response(text)[0].startswith("SELECT")
+
+
+def test_fenced_reply_parses_to_the_statement():
+    text, _ = _feed(["```sql\nSELECT name FROM t\n```\nThis lists names; enjoy."])
+
+    assert _parse_sql_response(text) == ("SELECT name FROM t", False)